@@ -12,14 +12,16 @@ settings = settings.settings
 from loguru import logger
 
 from prompting import mutable_globals
-from prompting.base.dendrite import DendriteResponseEvent
-from prompting.base.epistula import query_miners
+from prompting.base.dendrite import DendriteResponseEvent, SynapseStreamResult
+from prompting.base.epistula import MinerQuery, query_miners_quorum
 from prompting.base.forward import log_stream_results
+from prompting.base.io_scheduler import outbound_scheduler
 from prompting.base.validator import BaseValidatorNeuron
 from prompting.llms.model_manager import model_scheduler
 from prompting.llms.utils import GPUInfo
 from prompting.miner_availability.miner_availability import availability_checking_loop, miner_availabilities
 from prompting.mutable_globals import scoring_queue
+from prompting.rewards.registry import reward_registry
 from prompting.rewards.scoring import task_scorer
 from prompting.tasks.base_task import BaseTextTask
 from prompting.tasks.task_creation import task_loop
@@ -37,6 +39,8 @@ class Validator(BaseValidatorNeuron):
         super(Validator, self).__init__(config=config)
         self.load_state()
         self._lock = asyncio.Lock()
+        # Queries whose stragglers are still streaming, kept referenced until they reach the scoring queue.
+        self._pending_scoring: set[asyncio.Task] = set()
         self.time_of_block_sync = None
 
     @property
@@ -63,10 +67,9 @@ class Validator(BaseValidatorNeuron):
     async def run_step(self, k: int, timeout: float) -> ValidatorLoggingEvent | ErrorLoggingEvent | None:
         """Executes a single step of the agent, which consists of:
         - Getting a list of uids to query
-        - Querying the network
-        - Rewarding the network
-        - Updating the scores
-        - Logging the event
+        - Querying the network until a quorum of the miners succeeded
+        - Logging the event of the quorum's responses
+        - Queueing all responses for scoring once the remaining miners finished, in the background
         Args:
             agent (HumanAgent): The agent to run the step for.
             roles (List[str]): The roles for the synapse.
@@ -75,7 +78,7 @@ class Validator(BaseValidatorNeuron):
             timeout (float): The timeout for the queries.
             exclude (list, optional): The list of uids to exclude from the query. Defaults to [].
         """
-        while len(scoring_queue) > settings.SCORING_QUEUE_LENGTH_THRESHOLD:
+        while len(scoring_queue) + len(self._pending_scoring) > settings.SCORING_QUEUE_LENGTH_THRESHOLD:
             # logger.debug("Scoring queue is full. Waiting 1 second...")
             await asyncio.sleep(1)
         while len(mutable_globals.task_queue) == 0:
@@ -86,30 +89,38 @@ class Validator(BaseValidatorNeuron):
             mutable_globals.task_queue: list[BaseTextTask]
             task = mutable_globals.task_queue.pop(0)
 
-            # send the task to the miners and collect the responses
+            # send the task to the miners and collect the responses of the fastest ones
             with Timer() as timer:
-                response_event = await self.collect_responses(task=task)
-            if response_event is None:
+                collected = await self.collect_responses(task=task)
+            if collected is None:
                 logger.warning("No response event collected. This should not be happening.")
                 return
-            logger.debug(f"Collected responses in {timer.elapsed_time:.2f} seconds")
+            stream_results, query = collected
+            logger.debug(
+                f"Collected {len(stream_results)}/{len(query.uids)} responses ({query.succeeded} successful) in "
+                f"{timer.elapsed_time:.2f} seconds, {len(query.pending)} still streaming"
+            )
+            log_stream_results(stream_results)
 
-            # scoring_manager will score the responses as and when the correct model is loaded
-            task_scorer.add_to_queue(
-                task=task,
-                response=response_event,
-                dataset_entry=task.dataset_entry,
-                block=self.estimate_block,
-                step=self.step,
-                task_id=task.task_id,
+            # the remaining miners keep streaming in the background, the task is scored once they are all in
+            scoring_task = asyncio.create_task(
+                self.queue_for_scoring(
+                    task=task, query=query, quorum_results=stream_results, block=self.estimate_block, step=self.step
+                )
             )
+            self._pending_scoring.add(scoring_task)
+            scoring_task.add_done_callback(self._pending_scoring.discard)
 
             # Log the step event.
             return ValidatorLoggingEvent(
                 block=self.estimate_block,
                 step=self.step,
                 step_time=timer.elapsed_time,
-                response_event=response_event,
+                response_event=DendriteResponseEvent(
+                    stream_results=stream_results,
+                    uids=[result.uid for result in stream_results],
+                    timeout=settings.NEURON_TIMEOUT,
+                ),
                 task_id=task.task_id,
             )
 
@@ -119,7 +130,8 @@ class Validator(BaseValidatorNeuron):
                 error=str(ex),
             )
 
-    async def collect_responses(self, task: BaseTextTask) -> DendriteResponseEvent | None:
+    async def collect_responses(self, task: BaseTextTask) -> tuple[list[SynapseStreamResult], MinerQuery] | None:
+        """Query the miners and return once a quorum of them succeeded, with the query the others keep streaming in."""
         # Get the list of uids and their axons to query for this step.
         uids = miner_availabilities.get_available_miners(task=task, model=task.llm_model_id, k=NEURON_SAMPLE_SIZE)
         logger.debug(f"🔍 Querying uids: {uids}")
@@ -137,14 +149,47 @@ class Validator(BaseValidatorNeuron):
             ],
         }
         body_bytes = json.dumps(body).encode("utf-8")
-        stream_results = await query_miners(uids, body_bytes)
-
-        log_stream_results(stream_results)
-
-        response_event = DendriteResponseEvent(
-            stream_results=stream_results, uids=uids, timeout=settings.NEURON_TIMEOUT
+        stream_results, query = await query_miners_quorum(
+            uids, body_bytes, quorum=settings.NEURON_QUORUM, deadline=settings.NEURON_QUORUM_DEADLINE
         )
-        return response_event
+        if query is None:
+            return
+        return stream_results, query
+
+    async def queue_for_scoring(
+        self,
+        task: BaseTextTask,
+        query: MinerQuery,
+        quorum_results: list[SynapseStreamResult],
+        block: int,
+        step: int,
+    ) -> None:
+        """Wait for the miners which were still streaming at the quorum and add all responses to the scoring queue."""
+        try:
+            tail_results = await query.tail()
+            log_stream_results(tail_results)
+            logger.debug(f"Outbound scheduler: {outbound_scheduler.metrics()}")
+            # Keep the order of the queried uids, which the quorum and the tail results each follow.
+            order = {uid: idx for idx, uid in enumerate(query.uids)}
+            stream_results = sorted(quorum_results + tail_results, key=lambda result: order.get(result.uid, -1))
+
+            response_event = DendriteResponseEvent(
+                stream_results=stream_results,
+                uids=[result.uid for result in stream_results],
+                timeout=settings.NEURON_TIMEOUT,
+            )
+
+            # scoring_manager will score the responses as and when the correct model is loaded
+            task_scorer.add_to_queue(
+                task=task,
+                response=response_event,
+                dataset_entry=task.dataset_entry,
+                block=block,
+                step=step,
+                task_id=task.task_id,
+            )
+        except Exception as ex:
+            logger.exception(ex)
 
     async def forward(self):
         """
@@ -214,6 +259,10 @@ async def main():
 
     # start scoring tasks in separate loop
     asyncio.create_task(task_scorer.start())
+
+    # load the reward models ahead of the first task to score
+    if settings.REWARD_WARMUP:
+        asyncio.create_task(asyncio.to_thread(reward_registry.warmup))
     # TODO: Think about whether we want to store the task queue locally in case of a crash
     # TODO: Possibly run task scorer & model scheduler with a lock so I don't unload a model whilst it's generating
     # TODO: Make weight setting happen as specific intervals as we load/unload models
@@ -0,0 +1,88 @@
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from enum import Enum
+
+from loguru import logger
+
+from prompting.base.dendrite import SynapseStreamResult
+from prompting.settings import settings
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class Circuit:
+    state: CircuitState = CircuitState.CLOSED
+    consecutive_failures: int = 0
+    # Number of times the circuit opened without closing in between, drives the exponential backoff.
+    trips: int = 0
+    open_until: float = 0.0
+
+
+class CircuitBreakerRegistry:
+    """Per-uid circuit breakers for miners whose axon can't be reached.
+
+    A circuit opens after `CIRCUIT_BREAKER_FAILURE_THRESHOLD` consecutive failures and the uid is excluded from
+    sampling. Once the backoff has elapsed the circuit is half-open: the uid is still not sampled for tasks, but
+    the availability loop probes it and a successful probe closes the circuit, while a failed one opens it again
+    with twice the backoff.
+    """
+
+    def __init__(self):
+        self.circuits: dict[int, Circuit] = defaultdict(Circuit)
+
+    def state(self, uid: int) -> CircuitState:
+        circuit = self.circuits.get(uid)
+        if circuit is None:
+            return CircuitState.CLOSED
+        if circuit.state == CircuitState.OPEN and time.monotonic() >= circuit.open_until:
+            circuit.state = CircuitState.HALF_OPEN
+        return circuit.state
+
+    def is_closed(self, uid: int) -> bool:
+        return self.state(uid) == CircuitState.CLOSED
+
+    def half_open_uids(self) -> list[int]:
+        return [uid for uid in list(self.circuits) if self.state(uid) == CircuitState.HALF_OPEN]
+
+    def record_success(self, uid: int) -> None:
+        circuit = self.circuits.get(uid)
+        if circuit is None:
+            return
+        if circuit.state != CircuitState.CLOSED:
+            logger.debug(f"Closing circuit of miner {uid}")
+        del self.circuits[uid]
+
+    def record_failure(self, uid: int) -> None:
+        circuit = self.circuits[uid]
+        circuit.consecutive_failures += 1
+        if circuit.state == CircuitState.HALF_OPEN or (
+            circuit.state == CircuitState.CLOSED
+            and circuit.consecutive_failures >= settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        ):
+            backoff = min(settings.CIRCUIT_BREAKER_BACKOFF * 2**circuit.trips, settings.CIRCUIT_BREAKER_MAX_BACKOFF)
+            circuit.trips += 1
+            circuit.state = CircuitState.OPEN
+            circuit.open_until = time.monotonic() + backoff
+            logger.debug(
+                f"Opening circuit of miner {uid} for {backoff:.0f}s after {circuit.consecutive_failures} failures"
+            )
+
+    def record_result(self, result: SynapseStreamResult, unreachable: bool) -> None:
+        """Feed the outcome of an inference request.
+
+        Only connection-level failures, where the miner didn't answer at all, count as failures. Read timeouts and
+        error statuses come from miners which can be reached, so they are left to the rewards.
+        """
+        if unreachable and not result.accumulated_chunks:
+            self.record_failure(result.uid)
+        else:
+            self.record_success(result.uid)
+
+
+circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,117 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+import bittensor as bt
+import httpx
+from loguru import logger
+
+from prompting.settings import settings
+
+AxonKey = tuple[str, int, str]
+
+
+def axon_key(axon_info: "bt.AxonInfo") -> AxonKey:
+    """Key identifying a miner endpoint; a change in any field means the pooled connections are stale."""
+    return (axon_info.ip, axon_info.port, axon_info.hotkey)
+
+
+@dataclass
+class AxonClient:
+    """Long-lived HTTP clients for a single axon.
+
+    The httpx client owns the connection pool and is shared by the availability and the inference calls, so
+    both paths reuse the same keep-alive connections.
+    """
+
+    key: AxonKey
+    http_client: httpx.AsyncClient
+    loop: asyncio.AbstractEventLoop
+    last_used: float = field(default_factory=time.monotonic)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.key[0]}:{self.key[1]}"
+
+    async def aclose(self):
+        try:
+            await self.http_client.aclose()
+        except Exception as ex:
+            logger.debug(f"Failed to close client for axon {self.key[0]}:{self.key[1]}: {ex}")
+
+
+class AxonClientPool:
+    """Registry of pooled clients keyed by axon (ip, port, hotkey).
+
+    Clients are created lazily on first use, evicted after `AXON_CLIENT_IDLE_TIMEOUT` seconds without
+    traffic and rebuilt when `invalidate` is called for an axon whose info changed on the metagraph.
+    """
+
+    def __init__(self):
+        self._clients: dict[AxonKey, AxonClient] = {}
+        self._stale: list[AxonClient] = []
+        self._last_eviction: float = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def _build(self, key: AxonKey, loop: asyncio.AbstractEventLoop) -> AxonClient:
+        # Imported here to avoid a circular import, epistula depends on this module.
+        from prompting.base.epistula import create_header_hook
+
+        limits = httpx.Limits(
+            max_connections=settings.AXON_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.AXON_CLIENT_MAX_KEEPALIVE,
+            keepalive_expiry=settings.AXON_CLIENT_IDLE_TIMEOUT,
+        )
+        http_client = httpx.AsyncClient(
+            limits=limits,
+            event_hooks={"request": [create_header_hook(settings.WALLET.hotkey, key[2])]},
+        )
+        return AxonClient(key=key, http_client=http_client, loop=loop)
+
+    def get(self, axon_info: "bt.AxonInfo") -> AxonClient:
+        """Return the pooled client for an axon, creating it if needed."""
+        key = axon_key(axon_info)
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(key)
+        # Connection pools are bound to the event loop they were created on.
+        if client is None or client.loop is not loop:
+            if client is not None:
+                self._stale.append(client)
+            client = self._build(key, loop)
+            self._clients[key] = client
+        client.last_used = time.monotonic()
+        return client
+
+    def invalidate(self, axon_info: "bt.AxonInfo") -> None:
+        """Drop the client of an axon so that it is rebuilt on next use. Safe to call from sync code."""
+        client = self._clients.pop(axon_key(axon_info), None)
+        if client is not None:
+            self._stale.append(client)
+
+    async def evict_idle(self) -> None:
+        """Close clients which were invalidated or have been idle for longer than the idle timeout."""
+        now = time.monotonic()
+        if now - self._last_eviction < settings.AXON_CLIENT_IDLE_TIMEOUT and not self._stale:
+            return
+        self._last_eviction = now
+        for key, client in list(self._clients.items()):
+            if now - client.last_used > settings.AXON_CLIENT_IDLE_TIMEOUT:
+                self._stale.append(self._clients.pop(key))
+
+        loop = asyncio.get_running_loop()
+        stale, self._stale = self._stale, []
+        closable = [client for client in stale if client.loop is loop]
+        if closable:
+            logger.debug(f"Closing {len(closable)} stale axon clients, {len(self._clients)} remaining")
+            await asyncio.gather(*[client.aclose() for client in closable])
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            self._stale.append(client)
+        self._clients = {}
+        await self.evict_idle()
+
+
+axon_client_pool = AxonClientPool()
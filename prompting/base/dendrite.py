@@ -1,17 +1,23 @@
+from array import array
+
 import numpy as np
-from pydantic import BaseModel, ConfigDict, model_validator
+from pydantic import BaseModel, ConfigDict, PrivateAttr, computed_field, model_validator
 
 from prompting.utils.misc import serialize_exception_to_string
+from prompting.utils.timer import StreamTimingStats
 
 
 class SynapseStreamResult(BaseModel):
     exception: str | None = None
     uid: int | None = None
     accumulated_chunks: list[str] | None = None
-    accumulated_chunks_timings: list[float] | None = None
-    tokens_per_chunk: list[int] | None = None
+    # Seconds since the request was sent, an `array('d')` when captured with a `ChunkTimer`.
+    accumulated_chunks_timings: array | list[float] | None = None
+    # Filled on demand by `count_tokens_per_chunk`, one int32 count per chunk.
+    tokens_per_chunk: np.ndarray | list[int] | None = None
     status_code: int = 200
     status_message: str = ""
+    timing_stats: StreamTimingStats | None = None
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -30,54 +36,100 @@ class SynapseStreamResult(BaseModel):
             "accumulated_chunks": self.accumulated_chunks,
             "accumulated_chunks_timings": self.accumulated_chunks_timings,
             "tokens_per_chunk": self.tokens_per_chunk,
+            "timing_stats": self.timing_stats,
         }
 
 
 class DendriteResponseEvent(BaseModel):
+    """The responses of all miners queried for a task.
+
+    The per-miner data is stored column-wise: uids, status codes and timings as numpy arrays and the completions
+    as one list, joined once from the chunks. The chunk data is not copied, the `stream_results_*` attributes are
+    views onto the stream results.
+    """
+
     uids: np.ndarray | list[float]
     timeout: float
     stream_results: list[SynapseStreamResult]
-    completions: list[str] = []
-    status_messages: list[str] = []
-    status_codes: list[int] = []
-    timings: list[float] = []
-    stream_results_uids: list[int] = []
-    stream_results_exceptions: list[str] = []
-    stream_results_all_chunks: list[list[str]] = []
-    stream_results_all_chunks_timings: list[list[float]] = []
-    stream_results_all_tokens_per_chunk: list[list[int]] = []
+
+    _completions: list[str] = PrivateAttr(default_factory=list)
+    _status_codes: np.ndarray = PrivateAttr(default_factory=lambda: np.zeros(0, dtype=np.int16))
+    _timings: np.ndarray = PrivateAttr(default_factory=lambda: np.zeros(0, dtype=np.float64))
+    _stream_results_uids: np.ndarray = PrivateAttr(default_factory=lambda: np.zeros(0, dtype=np.int64))
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     @model_validator(mode="after")
     def process_stream_results(self) -> "DendriteResponseEvent":
-        # when passing this to a pydantic model, this method can be called multiple times, leading
-        # to duplicating the arrays. If the arrays are already filled, we can skip this step
-        if len(self.completions) > 0:
-            return self
-        for stream_result in self.stream_results:
-            # for some reason the language server needs this line to understand the type of stream_result
-
-            self.completions.append(stream_result.completion)
-            self.status_messages.append(stream_result.status_message)
-            status_code = stream_result.status_code
+        n_results = len(self.stream_results)
+        completions = self._completions = [stream_result.completion for stream_result in self.stream_results]
 
-            if len(stream_result.completion) == 0 and status_code == 200:
+        self._status_codes = np.empty(n_results, dtype=np.int16)
+        self._timings = np.zeros(n_results, dtype=np.float64)
+        self._stream_results_uids = np.array(
+            [-1 if stream_result.uid is None else stream_result.uid for stream_result in self.stream_results],
+            dtype=np.int64,
+        )
+        for idx, stream_result in enumerate(self.stream_results):
+            status_code = stream_result.status_code
+            if len(completions[idx]) == 0 and status_code == 200:
                 status_code = 204
+            self._status_codes[idx] = status_code
 
-            self.status_codes.append(status_code)
-            process_time = (
-                stream_result.accumulated_chunks_timings[-1] if stream_result.accumulated_chunks_timings else 0
-            )
             if status_code == 200 or status_code == 204:
-                self.timings.append(process_time)
+                timings = stream_result.accumulated_chunks_timings
+                self._timings[idx] = timings[-1] if timings else 0
             elif status_code == 408:
-                self.timings.append(self.timeout)
-            else:
-                self.timings.append(0)
-
-            self.stream_results_uids.append(stream_result.uid)
-            self.stream_results_exceptions.append(serialize_exception_to_string(stream_result.exception))
-            self.stream_results_all_chunks.append(stream_result.accumulated_chunks)
-            self.stream_results_all_chunks_timings.append(stream_result.accumulated_chunks_timings)
+                self._timings[idx] = self.timeout
         return self
+
+    @computed_field
+    @property
+    def completions(self) -> list[str]:
+        return self._completions
+
+    @computed_field
+    @property
+    def status_messages(self) -> list[str]:
+        return [stream_result.status_message for stream_result in self.stream_results]
+
+    @computed_field
+    @property
+    def status_codes(self) -> np.ndarray:
+        return self._status_codes
+
+    @computed_field
+    @property
+    def timings(self) -> np.ndarray:
+        return self._timings
+
+    @computed_field
+    @property
+    def stream_results_uids(self) -> np.ndarray:
+        return self._stream_results_uids
+
+    @computed_field
+    @property
+    def stream_results_exceptions(self) -> list[str | None]:
+        return [serialize_exception_to_string(stream_result.exception) for stream_result in self.stream_results]
+
+    @computed_field
+    @property
+    def stream_results_all_chunks(self) -> list[list[str] | None]:
+        return [stream_result.accumulated_chunks for stream_result in self.stream_results]
+
+    @computed_field
+    @property
+    def stream_results_all_chunks_timings(self) -> list[list[float] | None]:
+        return [
+            timings.tolist() if isinstance(timings, array) else timings
+            for timings in (stream_result.accumulated_chunks_timings for stream_result in self.stream_results)
+        ]
+
+    @computed_field
+    @property
+    def stream_results_all_tokens_per_chunk(self) -> list[np.ndarray | list[int]]:
+        return [
+            [] if stream_result.tokens_per_chunk is None else stream_result.tokens_per_chunk
+            for stream_result in self.stream_results
+        ]
@@ -1,20 +1,27 @@
 import asyncio
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha256
 from math import ceil
-from typing import Annotated, Any, Dict, List, Optional
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional
 from uuid import uuid4
 
 import bittensor as bt
 import httpx
-import openai
 from httpx import Timeout
 from loguru import logger
 from substrateinterface import Keypair
 
+from prompting.base.circuit_breaker import circuit_breakers
+from prompting.base.client_pool import axon_client_pool
 from prompting.base.dendrite import SynapseStreamResult
+from prompting.base.io_scheduler import TrafficClass, outbound_scheduler
+from prompting.base.latency import miner_latencies
+from prompting.base.sse import iter_content
 from prompting.settings import settings
+from prompting.utils.timer import ChunkTimer
 
 
 def verify_signature(
@@ -44,34 +51,115 @@ def verify_signature(
     return None
 
 
+SSE_REQUEST_HEADERS = {"Content-Type": "application/json", "Accept": "text/event-stream"}
+
+
+class SignatureCache:
+    """Caches the parts of the Epistula headers which do not change between requests of a fan-out.
+
+    The secret signatures only depend on the 10 second timestamp interval and the receiving hotkey, so
+    they are computed once per (axon hotkey, interval) window. The body digest and the body fields merged
+    into the headers are computed once per distinct body. Both caches are shared by the signing threads, so their
+    updates are made under a lock while the hashing and signing run outside of it.
+    """
+
+    def __init__(self, max_bodies: int = 8):
+        self.max_bodies = max_bodies
+        self._secret_signatures: dict[tuple[str, str, float], tuple[str, str, str]] = {}
+        self._bodies: dict[bytes, tuple[str, dict[str, Any]]] = {}
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.EPISTULA_SIGNING_WORKERS, thread_name_prefix="epistula-signing"
+            )
+        return self._executor
+
+    def body(self, body_bytes: bytes) -> tuple[str, dict[str, Any]]:
+        """Return the sha256 hex digest of the body and the body fields to merge into the headers."""
+        with self._lock:
+            if (cached := self._bodies.get(body_bytes)) is not None:
+                return cached
+        try:
+            fields = json.loads(body_bytes)
+        except ValueError:
+            fields = {}
+        cached = (sha256(body_bytes).hexdigest(), fields if isinstance(fields, dict) else {})
+        with self._lock:
+            if body_bytes not in self._bodies:
+                while len(self._bodies) >= self.max_bodies:
+                    self._bodies.pop(next(iter(self._bodies)))
+                self._bodies[body_bytes] = cached
+        return cached
+
+    def secret_signatures(self, hotkey: Keypair, signed_for: str, timestamp_interval: float) -> tuple[str, str, str]:
+        key = (hotkey.ss58_address, signed_for, timestamp_interval)
+        with self._lock:
+            if (signatures := self._secret_signatures.get(key)) is not None:
+                return signatures
+        signatures = tuple(
+            "0x" + hotkey.sign(str(timestamp_interval + offset) + "." + signed_for).hex() for offset in (-1, 0, 1)
+        )
+        with self._lock:
+            # Drop the windows which can no longer be used.
+            for stale_key in [k for k in self._secret_signatures if k[2] < timestamp_interval - 1e4]:
+                del self._secret_signatures[stale_key]
+            self._secret_signatures[key] = signatures
+        return signatures
+
+    async def prepare(self, hotkey: Keypair, body_bytes: bytes, signed_for: list[str]) -> None:
+        """Precompute the body digest and the secret signatures of all targets in the signing thread pool."""
+        timestamp_interval = ceil(round(time.time() * 1000) / 1e4) * 1e4
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            loop.run_in_executor(self.executor, self.body, body_bytes),
+            *[
+                loop.run_in_executor(self.executor, self.secret_signatures, hotkey, target, timestamp_interval)
+                for target in set(signed_for)
+            ],
+        )
+
+
+signature_cache = SignatureCache()
+
+
 def generate_header(
     hotkey: Keypair,
-    body_bytes: Dict[str, Any],
+    body_bytes: bytes,
     signed_for: Optional[str] = None,
 ) -> Dict[str, Any]:
     timestamp = round(time.time() * 1000)
     timestampInterval = ceil(timestamp / 1e4) * 1e4
     uuid = str(uuid4())
+    body_digest, body_fields = signature_cache.body(body_bytes)
     headers = {
         "Epistula-Version": "2",
         "Epistula-Timestamp": str(timestamp),
         "Epistula-Uuid": uuid,
         "Epistula-Signed-By": hotkey.ss58_address,
-        "Epistula-Request-Signature": "0x"
-        + hotkey.sign(f"{sha256(body_bytes).hexdigest()}.{uuid}.{timestamp}.{signed_for or ''}").hex(),
+        "Epistula-Request-Signature": "0x" + hotkey.sign(f"{body_digest}.{uuid}.{timestamp}.{signed_for or ''}").hex(),
     }
     if signed_for:
         headers["Epistula-Signed-For"] = signed_for
-        headers["Epistula-Secret-Signature-0"] = "0x" + hotkey.sign(str(timestampInterval - 1) + "." + signed_for).hex()
-        headers["Epistula-Secret-Signature-1"] = "0x" + hotkey.sign(str(timestampInterval) + "." + signed_for).hex()
-        headers["Epistula-Secret-Signature-2"] = "0x" + hotkey.sign(str(timestampInterval + 1) + "." + signed_for).hex()
-        headers.update(json.loads(body_bytes))
+        secret_signatures = signature_cache.secret_signatures(hotkey, signed_for, timestampInterval)
+        for i, signature in enumerate(secret_signatures):
+            headers[f"Epistula-Secret-Signature-{i}"] = signature
+        headers.update(body_fields)
     return headers
 
 
 def create_header_hook(hotkey, axon_hotkey):
     async def add_headers(request: httpx.Request):
-        for key, header in generate_header(hotkey, request.read(), axon_hotkey).items():
+        # Pooled clients are shared with the availability calls, which are not signed.
+        if not request.url.path.startswith("/v1/"):
+            return request
+        headers = await asyncio.get_running_loop().run_in_executor(
+            signature_cache.executor, generate_header, hotkey, request.read(), axon_hotkey
+        )
+        for key, header in headers.items():
             if key not in ["messages", "model", "stream"]:
                 request.headers[key] = str(header)
         return request
@@ -79,32 +167,135 @@ def create_header_hook(hotkey, axon_hotkey):
     return add_headers
 
 
-async def query_miners(uids, body):
-    try:
-        tasks = []
-        for uid in uids:
-            tasks.append(
-                asyncio.create_task(
-                    handle_inference(
-                        settings.METAGRAPH,
-                        settings.WALLET,
-                        body,
-                        uid,
-                    )
+async def start_queries(uids, body) -> list[asyncio.Task]:
+    """Start the inference requests of a fan-out, returning one task per uid in the order of `uids`."""
+    # The same request body is sent to every miner, so it is serialised, hashed and signed for once.
+    payload = json.loads(body)
+    payload["stream"] = True
+    body = json.dumps(payload).encode("utf-8")
+    await axon_client_pool.evict_idle()
+    await signature_cache.prepare(settings.WALLET.hotkey, body, [settings.METAGRAPH.axons[uid].hotkey for uid in uids])
+    tasks = []
+    for uid in uids:
+        tasks.append(
+            asyncio.create_task(
+                handle_inference(
+                    settings.METAGRAPH,
+                    settings.WALLET,
+                    body,
+                    uid,
                 )
             )
+        )
+    return tasks
+
+
+class MinerQuery:
+    """A fan-out of inference requests which can be consumed before the slowest miner has finished."""
+
+    def __init__(self, uids: list[int], tasks: list[asyncio.Task]):
+        self.uids = list(uids)
+        self.tasks = tasks
+        # Tasks whose results were already handed out by `wait_for_quorum` or `tail`.
+        self._collected: set[asyncio.Task] = set()
+
+    @property
+    def completed(self) -> list[SynapseStreamResult]:
+        """Results which are already available, in the order of `uids`."""
+        return [task.result() for task in self.tasks if task.done() and not task.cancelled()]
+
+    @property
+    def pending(self) -> list[asyncio.Task]:
+        return [task for task in self.tasks if not task.done()]
+
+    @property
+    def succeeded(self) -> int:
+        """Number of miners which already streamed a successful completion."""
+        return sum(
+            1
+            for result in self.completed
+            if result.exception is None and result.status_code == 200 and result.accumulated_chunks
+        )
+
+    async def wait_for_quorum(self, quorum: float = 1.0, deadline: float | None = None) -> list[SynapseStreamResult]:
+        """Wait until a `quorum` fraction of the miners has succeeded or `deadline` seconds have passed.
+
+        Failed requests don't count towards the quorum. Returns every result available by then, the stragglers keep
+        running in the background and their results can be collected later with `tail`.
+        """
+        required = ceil(quorum * len(self.tasks))
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + deadline if deadline is not None else None
+        pending = set(self.pending)
+        while pending and self.succeeded < required:
+            timeout = None if deadline_at is None else deadline_at - loop.time()
+            if timeout is not None and timeout <= 0:
+                break
+            _, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        done = [task for task in self.tasks if task.done() and not task.cancelled()]
+        self._collected.update(done)
+        return [task.result() for task in done]
+
+    async def tail(self) -> list[SynapseStreamResult]:
+        """Wait for the miners whose results weren't collected yet and return their results in the order of `uids`."""
+        tail = [task for task in self.tasks if task not in self._collected]
+        self._collected.update(tail)
+        results = await asyncio.gather(*tail, return_exceptions=True)
+        return [result for result in results if isinstance(result, SynapseStreamResult)]
+
+    async def stragglers(self) -> AsyncIterator[SynapseStreamResult]:
+        """Yield the results which were still outstanding when this is called, as they complete."""
+        for next_result in asyncio.as_completed(self.pending):
+            yield await next_result
+
+    async def results(self) -> list[SynapseStreamResult]:
+        """Wait for all miners and return their results in the order of `uids`."""
+        return list(await asyncio.gather(*self.tasks))
+
+
+async def query_miners(uids, body):
+    try:
+        tasks = await start_queries(uids, body)
         responses: List[SynapseStreamResult] = await asyncio.gather(*tasks)
+        logger.debug(f"Outbound scheduler: {outbound_scheduler.metrics()}")
         return responses
     except Exception as e:
         logger.error(f"Error in forward for: {e}")
         return []
 
 
+async def query_miners_as_completed(uids, body) -> AsyncIterator[SynapseStreamResult]:
+    """Yield each miner's result as soon as its stream has completed."""
+    try:
+        tasks = await start_queries(uids, body)
+    except Exception as e:
+        logger.error(f"Error in forward for: {e}")
+        return
+    for next_result in asyncio.as_completed(tasks):
+        yield await next_result
+
+
+async def query_miners_quorum(
+    uids, body, quorum: float = 1.0, deadline: float | None = None
+) -> tuple[list[SynapseStreamResult], MinerQuery | None]:
+    """Return once a `quorum` fraction of the miners succeeded or after `deadline` seconds.
+
+    Returns the results collected so far together with the `MinerQuery`, whose `tail` collects the stragglers.
+    """
+    try:
+        query = MinerQuery(uids=uids, tasks=await start_queries(uids, body))
+        return await query.wait_for_quorum(quorum=quorum, deadline=deadline), query
+    except Exception as e:
+        logger.error(f"Error in forward for: {e}")
+        return [], None
+
+
 async def query_availabilities(uids, task_config, model_config):
     """Query the availability of the miners"""
     availability_dict = {"task_availabilities": task_config, "llm_model_availabilities": model_config}
     # Query the availability of the miners
     try:
+        await axon_client_pool.evict_idle()
         tasks = []
         for uid in uids:
             tasks.append(
@@ -130,13 +321,10 @@ async def handle_availability(
     uid: int,
 ) -> Dict[str, bool]:
     try:
-        axon_info = metagraph.axons[uid]
-        url = f"http://{axon_info.ip}:{axon_info.port}/availability"
-
+        client = axon_client_pool.get(metagraph.axons[uid])
         timeout = httpx.Timeout(settings.NEURON_TIMEOUT, connect=5, read=5)
-
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(url, json=request)
+        async with outbound_scheduler.slot(TrafficClass.AVAILABILITY):
+            response = await client.http_client.post(f"{client.base_url}/availability", json=request, timeout=timeout)
 
         response.raise_for_status()
         return response.json()
@@ -150,64 +338,101 @@ async def handle_inference(
     wallet: "bt.wallet",
     body: Dict[str, Any],
     uid: int,
+    traffic_class: TrafficClass = TrafficClass.INFERENCE,
 ) -> SynapseStreamResult:
     exception = None
     chunks = []
-    chunk_timings = []
-    try:
-        start_time = time.time()
-        axon_info = metagraph.axons[uid]
-        miner = openai.AsyncOpenAI(
-            base_url=f"http://{axon_info.ip}:{axon_info.port}/v1",
-            api_key="Apex",
-            max_retries=0,
-            timeout=Timeout(settings.NEURON_TIMEOUT, connect=5, read=10),
-            http_client=openai.DefaultAsyncHttpxClient(
-                event_hooks={"request": [create_header_hook(wallet.hotkey, axon_info.hotkey)]}
-            ),
-        )
-        try:
-            payload = json.loads(body)
-            chat = await miner.chat.completions.create(
-                messages=payload["messages"],
-                model=payload["model"],
-                stream=True,
-                extra_body={k: v for k, v in payload.items() if k not in ["messages", "model"]},
+    chunk_timer = ChunkTimer()
+    timeouts = miner_latencies.timeouts(uid)
+    # Whether the miner sent its response headers, a timeout before them means it can't be reached.
+    responded = False
+
+    async def stream_chunks():
+        response: httpx.Response | None = None
+        contents: AsyncIterator[str] | None = None
+
+        async def first_chunk() -> str | None:
+            nonlocal response, contents, responded
+            request = client.http_client.build_request(
+                "POST",
+                f"{client.base_url}/v1/chat/completions",
+                content=body,
+                headers=SSE_REQUEST_HEADERS,
+                timeout=Timeout(timeouts.total, connect=timeouts.connect, read=timeouts.read),
             )
-            async for chunk in chat:
-                if chunk.choices[0].delta and chunk.choices[0].delta.content:
-                    chunks.append(chunk.choices[0].delta.content)
-                    chunk_timings.append(time.time() - start_time)
+            response = await client.http_client.send(request, stream=True)
+            responded = True
+            response.raise_for_status()
+            contents = aiter(iter_content(response))
+            return await anext(contents, None)
 
-        except openai.APIConnectionError as e:
-            logger.trace(f"Miner {uid} failed request: {e}")
-            exception = e
+        try:
+            # Only the first chunk is held to the miner's first-byte timeout, pauses between the later chunks are
+            # bounded by the read timeout.
+            content = await asyncio.wait_for(first_chunk(), timeout=timeouts.first_byte)
+            if content is None:
+                return
+            chunks.append(content)
+            chunk_timer.tick()
+            async for content in contents:
+                chunks.append(content)
+                chunk_timer.tick()
+        finally:
+            if response is not None:
+                await response.aclose()
 
-        except Exception as e:
-            logger.trace(f"Unknown Error when sending to miner {uid}: {e}")
-            exception = e
+    try:
+        # Waiting for a slot does not count towards the miner's timings or deadline.
+        async with outbound_scheduler.slot(traffic_class):
+            try:
+                chunk_timer.start()
+                client = axon_client_pool.get(metagraph.axons[uid])
+                # The total deadline bounds the whole stream, including the wait for the first chunk.
+                await asyncio.wait_for(stream_chunks(), timeout=timeouts.total)
+
+            except (asyncio.TimeoutError, httpx.TimeoutException) as e:
+                logger.trace(f"Miner {uid} exceeded the stream deadline: {e}")
+                exception = e
+
+            except httpx.TransportError as e:
+                logger.trace(f"Miner {uid} failed request: {e}")
+                exception = e
+
+            except Exception as e:
+                logger.trace(f"Unknown Error when sending to miner {uid}: {e}")
+                exception = e
 
     except Exception as e:
         exception = e
         logger.error(f"{uid}: Error in forward for: {e}")
     finally:
-        if exception:
-            exception = str(exception)
         if exception is None:
             status_code = 200
             status_message = "Success"
-        elif isinstance(exception, openai.APIConnectionError):
-            status_code = 502
-            status_message = str(exception)
+        elif isinstance(exception, (asyncio.TimeoutError, httpx.TimeoutException)):
+            status_code = 500
+            status_message = (
+                f"Stream timed out, first byte timeout {timeouts.first_byte}s, deadline {timeouts.total}s: {exception}"
+            )
         else:
             status_code = 500
             status_message = str(exception)
+        unreachable = isinstance(exception, (httpx.ConnectError, httpx.ConnectTimeout)) or (
+            isinstance(exception, (asyncio.TimeoutError, httpx.TimeoutException)) and not responded
+        )
+        if exception is not None:
+            exception = str(exception) or exception.__class__.__name__
+        timing_stats = chunk_timer.stats()
+        miner_latencies.record(uid, timing_stats, status_code)
 
-        return SynapseStreamResult(
+        result = SynapseStreamResult(
             accumulated_chunks=chunks,
-            accumulated_chunks_timings=chunk_timings,
+            accumulated_chunks_timings=chunk_timer.timings,
+            timing_stats=timing_stats,
             uid=uid,
             exception=exception,
             status_code=status_code,
             status_message=status_message,
         )
+        circuit_breakers.record_result(result, unreachable=unreachable)
+        return result
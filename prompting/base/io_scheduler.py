@@ -0,0 +1,124 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import Enum
+
+from prompting.settings import settings
+
+
+class TrafficClass(str, Enum):
+    # Listed in order of priority.
+    ORGANIC = "organic"
+    INFERENCE = "inference"
+    AVAILABILITY = "availability"
+
+
+class OutboundScheduler:
+    """Bounds the number of concurrent outbound miner requests.
+
+    Every request holds one slot of the global capacity for its whole duration, and each traffic class can
+    hold at most its quota of slots. When slots free up, waiting organic requests are served first, then
+    inference and then availability requests, first come first served within a class.
+    """
+
+    def __init__(self, capacity: int | None = None, quotas: dict[TrafficClass, int] | None = None):
+        self._capacity = capacity
+        self._quotas = quotas
+        self.active: dict[TrafficClass, int] = {traffic_class: 0 for traffic_class in TrafficClass}
+        self.waiters: dict[TrafficClass, deque[asyncio.Future]] = {
+            traffic_class: deque() for traffic_class in TrafficClass
+        }
+        self.completed: dict[TrafficClass, int] = {traffic_class: 0 for traffic_class in TrafficClass}
+        self.total_wait_time: dict[TrafficClass, float] = {traffic_class: 0.0 for traffic_class in TrafficClass}
+        self.max_queue_depth: dict[TrafficClass, int] = {traffic_class: 0 for traffic_class in TrafficClass}
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity or settings.OUTBOUND_MAX_CONCURRENCY
+
+    def quota(self, traffic_class: TrafficClass) -> int:
+        if self._quotas is not None:
+            return self._quotas[traffic_class]
+        return {
+            TrafficClass.ORGANIC: settings.OUTBOUND_ORGANIC_QUOTA,
+            TrafficClass.INFERENCE: settings.OUTBOUND_INFERENCE_QUOTA,
+            TrafficClass.AVAILABILITY: settings.OUTBOUND_AVAILABILITY_QUOTA,
+        }[traffic_class]
+
+    def _can_run(self, traffic_class: TrafficClass) -> bool:
+        return sum(self.active.values()) < self.capacity and self.active[traffic_class] < self.quota(traffic_class)
+
+    def _has_priority_waiters(self, traffic_class: TrafficClass) -> bool:
+        """Whether requests of the same class, or of a higher priority class which could run, are already queued.
+
+        A higher priority class which is only blocked by its own quota does not hold back the lower classes.
+        """
+        for other in TrafficClass:
+            if other == traffic_class:
+                return bool(self.waiters[other])
+            if self.waiters[other] and self._can_run(other):
+                return True
+        return False
+
+    def _wake(self) -> None:
+        for traffic_class in TrafficClass:
+            waiters = self.waiters[traffic_class]
+            while waiters and self._can_run(traffic_class):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self.active[traffic_class] += 1
+                    waiter.set_result(None)
+
+    async def acquire(self, traffic_class: TrafficClass) -> None:
+        if self._can_run(traffic_class) and not self._has_priority_waiters(traffic_class):
+            self.active[traffic_class] += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters[traffic_class].append(waiter)
+        queue_depth = len(self.waiters[traffic_class])
+        self.max_queue_depth[traffic_class] = max(self.max_queue_depth[traffic_class], queue_depth)
+        # Serve whichever waiters can run now, higher priority classes first.
+        self._wake()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted right before the cancellation, hand it on.
+                self.release(traffic_class)
+            else:
+                try:
+                    self.waiters[traffic_class].remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self, traffic_class: TrafficClass) -> None:
+        self.active[traffic_class] -= 1
+        self.completed[traffic_class] += 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, traffic_class: TrafficClass):
+        start = time.perf_counter()
+        await self.acquire(traffic_class)
+        self.total_wait_time[traffic_class] += time.perf_counter() - start
+        try:
+            yield
+        finally:
+            self.release(traffic_class)
+
+    def metrics(self) -> dict[str, float]:
+        metrics: dict[str, float] = {}
+        for traffic_class in TrafficClass:
+            completed = self.completed[traffic_class]
+            metrics[f"{traffic_class.value}_active"] = self.active[traffic_class]
+            metrics[f"{traffic_class.value}_queue_depth"] = len(self.waiters[traffic_class])
+            metrics[f"{traffic_class.value}_max_queue_depth"] = self.max_queue_depth[traffic_class]
+            metrics[f"{traffic_class.value}_avg_wait_time"] = (
+                self.total_wait_time[traffic_class] / completed if completed else 0.0
+            )
+        return metrics
+
+
+outbound_scheduler = OutboundScheduler()
@@ -0,0 +1,94 @@
+from collections import defaultdict, deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from prompting.settings import settings
+from prompting.utils.timer import StreamTimingStats
+
+# Number of past streams per uid the timeouts are estimated from.
+HISTORY_LENGTH = 20
+# Minimum number of successful streams before the defaults are replaced by the estimate.
+MIN_SAMPLES = 5
+# Headroom on top of the observed p95 time to first token.
+TTFT_MARGIN = 2.0
+# Headroom on top of the observed p95 completion time.
+COMPLETION_MARGIN = 1.5
+
+
+@dataclass
+class MinerTimeouts:
+    connect: float
+    # Bounds the wait for the first chunk, the later chunks are each bounded by `read`.
+    first_byte: float
+    read: float
+    total: float
+
+
+@dataclass
+class MinerLatencyStats:
+    samples: int
+    ttft_p50: float
+    ttft_p95: float
+    completion_p95: float
+    consecutive_failures: int
+
+
+class MinerLatencyModel:
+    """Tracks time to first token and completion time of each miner's streams to derive per-uid timeouts.
+
+    Responsive miners get a first-byte timeout and a total deadline close to what they have shown to need, clamped
+    to the default budget, and endpoints which keep failing get an exponentially shorter connect timeout, so neither
+    holds a slot for the full default budget.
+    """
+
+    def __init__(self, history_length: int = HISTORY_LENGTH):
+        self.ttfts: dict[int, deque[float]] = defaultdict(lambda: deque(maxlen=history_length))
+        self.completion_times: dict[int, deque[float]] = defaultdict(lambda: deque(maxlen=history_length))
+        self.consecutive_failures: dict[int, int] = defaultdict(int)
+
+    def record(self, uid: int, timing_stats: StreamTimingStats | None, status_code: int) -> None:
+        """Record the outcome of one stream."""
+        if status_code != 200 or timing_stats is None or not timing_stats.n_chunks:
+            self.consecutive_failures[uid] += 1
+            return
+        self.consecutive_failures[uid] = 0
+        self.ttfts[uid].append(timing_stats.ttft)
+        self.completion_times[uid].append(timing_stats.total_time)
+
+    def stats(self, uid: int) -> MinerLatencyStats | None:
+        ttfts = self.ttfts.get(uid)
+        if not ttfts:
+            return None
+        return MinerLatencyStats(
+            samples=len(ttfts),
+            ttft_p50=float(np.percentile(ttfts, 50)),
+            ttft_p95=float(np.percentile(ttfts, 95)),
+            completion_p95=float(np.percentile(self.completion_times[uid], 95)),
+            consecutive_failures=self.consecutive_failures[uid],
+        )
+
+    def timeouts(self, uid: int) -> MinerTimeouts:
+        total = settings.NEURON_TIMEOUT
+        connect = settings.NEURON_CONNECT_TIMEOUT
+        first_byte = settings.NEURON_FIRST_BYTE_TIMEOUT
+
+        if failures := self.consecutive_failures.get(uid, 0):
+            connect = max(settings.NEURON_MIN_TIMEOUT, connect / 2**failures)
+
+        stats = self.stats(uid)
+        if stats is not None and stats.samples >= MIN_SAMPLES:
+            first_byte = min(first_byte, max(settings.NEURON_MIN_TIMEOUT, stats.ttft_p95 * TTFT_MARGIN))
+            if not failures:
+                # After a failure the miner gets the full deadline again, in case its completions got longer.
+                total = min(total, max(settings.NEURON_MIN_TIMEOUT, stats.completion_p95 * COMPLETION_MARGIN))
+
+        return MinerTimeouts(
+            connect=min(connect, total),
+            first_byte=min(first_byte, total),
+            read=min(settings.NEURON_READ_TIMEOUT, total),
+            total=total,
+        )
+
+
+miner_latencies = MinerLatencyModel()
@@ -0,0 +1,47 @@
+"""Minimal reader for OpenAI style chat completion streams (server-sent events).
+
+Only `choices[0].delta.content` is extracted from each event, which avoids building SDK response models for every
+chunk of every miner stream.
+"""
+
+import json
+from typing import AsyncIterator
+
+import httpx
+
+DONE = "[DONE]"
+
+_decode = json.JSONDecoder().decode
+
+
+class StreamError(Exception):
+    """Raised when the stream contains an error event instead of a completion chunk."""
+
+
+def parse_content(data: str) -> str | None:
+    """Return the content delta of a single `data:` payload, or None if the event carries no content."""
+    event = _decode(data)
+    if not isinstance(event, dict):
+        return None
+    if event.get("error"):
+        raise StreamError(str(event["error"]))
+    choices = event.get("choices")
+    if not choices:
+        return None
+    delta = choices[0].get("delta")
+    if not delta:
+        return None
+    return delta.get("content") or None
+
+
+async def iter_content(response: httpx.Response) -> AsyncIterator[str]:
+    """Yield the non-empty content deltas of a chat completion stream until the `[DONE]` event."""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            # Comments, `event:`/`id:` fields and the blank lines separating events.
+            continue
+        data = line[5:].strip()
+        if data == DONE:
+            return
+        if data and (content := parse_content(data)) is not None:
+            yield content
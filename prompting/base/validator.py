@@ -8,6 +8,7 @@ import numpy as np
 import torch
 from loguru import logger
 
+from prompting.base.client_pool import axon_client_pool
 from prompting.base.neuron import BaseNeuron
 from prompting.rewards.reward import WeightedRewardEvent
 from prompting.settings import settings
@@ -186,7 +187,11 @@ class BaseValidatorNeuron(BaseNeuron):
             return
 
         logger.info("Metagraph updated, re-syncing hotkeys, dendrite pool and moving averages")
-        logger.info("Metagraph updated, re-syncing hotkeys, dendrite pool and moving averages")
+        # Rebuild pooled clients of axons which changed ip, port or hotkey.
+        for previous_axon, axon in zip(previous_metagraph.axons, settings.METAGRAPH.axons):
+            if previous_axon != axon:
+                axon_client_pool.invalidate(previous_axon)
+
         # Zero out all hotkeys that have been replaced.
         for uid, hotkey in enumerate(self.hotkeys):
             if hotkey != settings.METAGRAPH.hotkeys[uid]:
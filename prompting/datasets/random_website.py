@@ -7,8 +7,7 @@ from loguru import logger
 
 from prompting.datasets.base import BaseDataset, Context, DatasetEntry
 from prompting.datasets.utils import ENGLISH_WORDS
-
-MAX_CHARS = 5000
+from prompting.utils.web_scraper import MAX_CHARS
 
 
 class DDGDatasetEntry(DatasetEntry):
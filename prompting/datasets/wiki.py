@@ -12,6 +12,7 @@ from loguru import logger
 from pydantic import ConfigDict, model_validator
 
 from prompting.datasets.base import BaseDataset, Context
+from prompting.utils.dates import extract_date_and_sentence
 
 # Create a queue called CACHED_ARTICLES to store wikipedia articles that have been fetched
 CACHED_ARTICLES: Queue[Context] = Queue(maxsize=300)
@@ -247,40 +248,8 @@ class WikiDateDataset(BaseDataset):
         self.rng = random.Random(self.seed)
         return self
 
-    def _extract_dates_and_sentences(self, text: str) -> tuple[str, str]:
-        # Regular expression to find dates in various formats
-        date_pattern = r"\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b|\b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{1,2}(?:st|nd|rd|th)?(?:,)?\s+\d{4}\b|\b\d{1,2}\s+(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember))\s+\d{4}\b|\b\d{4}\b"
-
-        # Compile the regex pattern
-        date_regex = re.compile(date_pattern)
-
-        # Split text into sentences
-        sentences = re.split(r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s", text)
-
-        # Iterate through sentences and find dates
-        for sentence in sentences:
-            # Find all dates in the sentence
-            dates = date_regex.findall(sentence)
-            # If dates are found, add them to the result dictionary with the corresponding sentence
-            if dates:
-                for date in dates:
-                    # Return the first date found
-                    return (str(date), sentence.replace(str(date), "<date>").strip())
-
-        # If no dates are found, search for dates in the form of "Month DD"
-        secondary_date_pattern = r"\b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{1,2}(?:st|nd|rd|th)?\b"
-        secondary_date_regex = re.compile(secondary_date_pattern)
-
-        for sentence in sentences:
-            # Find all dates in the sentence
-            dates = secondary_date_regex.findall(sentence)
-            # If dates are found, add them to the result dictionary with the corresponding sentence
-            if dates:
-                for date in dates:
-                    # Return the first date found
-                    return (str(date), sentence.replace(str(date), "<date>").strip())
-
-        return None
+    def _extract_dates_and_sentences(self, text: str) -> tuple[str, str] | None:
+        return extract_date_and_sentence(text)
 
     def _random_date(self) -> DateContext:
         for i in range(self.max_tries):
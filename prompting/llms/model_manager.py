@@ -1,5 +1,6 @@
 import asyncio
 import gc
+import time
 from typing import Dict
 
 import torch
@@ -164,8 +165,15 @@ class AsyncModelScheduler(AsyncLoopRunner):
 
     async def run_step(self):
         """This method is called periodically according to the interval."""
-        # try to load the model belonging to the oldest task in the queue
-        selected_model = scoring_queue[0].task.llm_model if scoring_queue else None
+        # load the model of the oldest task if it has waited too long, else the model with the most tasks waiting
+        backlog = scoring_queue.backlog()
+        backlog.pop(None, None)
+        selected_model = None
+        oldest = scoring_queue.peek()
+        if oldest and oldest.task.llm_model and time.monotonic() - oldest.created_at > settings.SCORING_MAX_TASK_AGE:
+            selected_model = oldest.task.llm_model
+        elif backlog:
+            selected_model = max(backlog, key=backlog.get)
         if not selected_model:
             selected_model = ModelZoo.get_random(max_ram=self.llm_model_manager.total_ram)
         logger.info(f"Loading model {selected_model.llm_model_id} for {self.interval} seconds.")
@@ -6,6 +6,7 @@ import numpy as np
 from loguru import logger
 from pydantic import BaseModel
 
+from prompting.base.circuit_breaker import circuit_breakers
 from prompting.base.epistula import query_availabilities
 from prompting.base.loop_runner import AsyncLoopRunner
 from prompting.llms.model_zoo import ModelZoo
@@ -47,7 +48,7 @@ class MinerAvailabilities(BaseModel):
     def get_available_miners(
         self, task: BaseTask | None = None, model: str | None = None, k: int | None = None
     ) -> list[int]:
-        available = list(self.miners.keys())
+        available = [uid for uid in self.miners.keys() if circuit_breakers.is_closed(uid)]
         if task:
             available = [uid for uid in available if self.miners[uid].is_task_available(task)]
         if model:
@@ -72,6 +73,9 @@ class CheckMinerAvailability(AsyncLoopRunner):
         uids_to_query = self.uids[start_index:end_index]
         if self.step == 0:
             uids_to_query = self.uids
+        # Probe the miners whose circuit is half-open, a successful response closes the circuit again.
+        uids_to_query = list(uids_to_query)
+        uids_to_query += [uid for uid in circuit_breakers.half_open_uids() if uid not in uids_to_query]
 
         logger.info(f"Collecting miner availabilities on uids: {uids_to_query}")
 
@@ -83,11 +87,13 @@ class CheckMinerAvailability(AsyncLoopRunner):
 
         for response, uid in zip(responses, uids_to_query):
             if not response:
+                circuit_breakers.record_failure(uid)
                 miner_availabilities.miners[uid] = MinerAvailability(
                     task_availabilities={task: True for task in task_config},
                     llm_model_availabilities={model: False for model in model_config},
                 )
             else:
+                circuit_breakers.record_success(uid)
                 miner_availabilities.miners[uid] = MinerAvailability(
                     task_availabilities=response["task_availabilities"],
                     llm_model_availabilities=response["llm_model_availabilities"],
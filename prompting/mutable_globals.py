@@ -1,3 +1,5 @@
+from prompting.utils.scoring_queue import ScoringQueue
+
 reward_events: list = []
-scoring_queue: list = []
+scoring_queue = ScoringQueue()
 task_queue: list = []
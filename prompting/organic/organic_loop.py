@@ -1,6 +1,6 @@
 import asyncio
 import json
-import time
+from array import array
 from dataclasses import dataclass, field
 from functools import partial
 from typing import AsyncGenerator, Tuple
@@ -12,11 +12,13 @@ from starlette.types import Send
 
 from prompting.base.dendrite import DendriteResponseEvent
 from prompting.base.forward import SynapseStreamResult
+from prompting.base.io_scheduler import TrafficClass, outbound_scheduler
 from prompting.base.protocol import StreamPromptingSynapse
 from prompting.datasets.base import ChatEntry
 from prompting.rewards.scoring import task_scorer
 from prompting.settings import settings
 from prompting.tasks.inference import InferenceTask
+from prompting.utils.timer import ChunkTimer, StreamTimingStats
 from prompting.utils.uids import get_random_uids
 
 
@@ -25,8 +27,8 @@ class Completion:
     uid: int
     completed: bool = False
     accumulated_chunks: list[str] = field(default_factory=list)
-    accumulated_chunks_timings: list[float] = field(default_factory=list)
-    accumulated_tokens_per_chunk: list[int] = field(default_factory=list)
+    accumulated_chunks_timings: array = field(default_factory=lambda: array("d"))
+    timing_stats: StreamTimingStats | None = None
 
 
 async def priority_fn(synapse: StreamPromptingSynapse) -> float:
@@ -94,7 +96,8 @@ async def wait_and_add(
     stream_results = [
         SynapseStreamResult(
             accumulated_chunks=completion.accumulated_chunks,
-            accumulated_chunks_timings=(completion.accumulated_chunks_timings),
+            accumulated_chunks_timings=completion.accumulated_chunks_timings,
+            timing_stats=completion.timing_stats,
             synapse=synapse,
             uid=completion.uid,
         )
@@ -125,36 +128,36 @@ async def stream_miner_response(
     async def stream_miner_chunks(uid: int, chunks: AsyncGenerator):
         logger.debug(f"[ORGANIC] Streaming chunks for UID: {uid}")
         accumulated_chunks: list[str] = []
-        accumulated_chunks_timings: list[float] = []
-        accumulated_tokens_per_chunk: list[int] = []
+        chunk_timer = ChunkTimer()
         synapse: StreamPromptingSynapse | None = None
-        timer_start = time.perf_counter()
-        async for chunk in chunks:
-            try:
-                if isinstance(chunk, str):
-                    accumulated_chunks.append(chunk)
-                    accumulated_chunks_timings.append(time.perf_counter() - timer_start)
-                    json_chunk = json.dumps({"uid": int(uid), "chunk": chunk})
-                    await send(
-                        {
-                            "type": "http.response.body",
-                            "body": json_chunk.encode("utf-8"),
-                            "more_body": True,
-                        }
-                    )
-                elif isinstance(chunk, StreamPromptingSynapse):
-                    synapse = chunk
-            except Exception:
-                logger.exception("[Organic] Error while streaming chunks")
-                break
+        async with outbound_scheduler.slot(TrafficClass.ORGANIC):
+            chunk_timer.start()
+            async for chunk in chunks:
+                try:
+                    if isinstance(chunk, str):
+                        accumulated_chunks.append(chunk)
+                        chunk_timer.tick()
+                        json_chunk = json.dumps({"uid": int(uid), "chunk": chunk})
+                        await send(
+                            {
+                                "type": "http.response.body",
+                                "body": json_chunk.encode("utf-8"),
+                                "more_body": True,
+                            }
+                        )
+                    elif isinstance(chunk, StreamPromptingSynapse):
+                        synapse = chunk
+                except Exception:
+                    logger.exception("[Organic] Error while streaming chunks")
+                    break
         await send({"type": "http.response.body", "body": b"", "more_body": False})
         logger.debug(f"[ORGANIC] Appending completion for UID: {uid}")
         completions.append(
             Completion(
                 uid=uid,
                 accumulated_chunks=accumulated_chunks,
-                accumulated_chunks_timings=accumulated_chunks_timings,
-                accumulated_tokens_per_chunk=accumulated_tokens_per_chunk,
+                accumulated_chunks_timings=chunk_timer.timings,
+                timing_stats=chunk_timer.stats(),
                 completed=True,
                 synapse=synapse,
             )
@@ -0,0 +1,111 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+
+from prompting.settings import settings
+
+
+class EmbeddingCache:
+    """LRU cache of embedding vectors bounded by the memory the vectors take up.
+
+    Keys are digests of (model name, pooling strategy, token limit, text), so the same text embedded by another model
+    or with other settings gets its own entry.
+    """
+
+    def __init__(self, max_bytes: int, dtype: np.dtype = np.float32):
+        self.max_bytes = max_bytes
+        self.dtype = np.dtype(dtype)
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(model_name: str, pooling_strategy: str, max_length: int | None, text: str) -> bytes:
+        return hashlib.blake2b(
+            f"{model_name}\0{pooling_strategy}\0{max_length}\0{text}".encode(), digest_size=16
+        ).digest()
+
+    def get(self, key: bytes) -> np.ndarray | None:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: bytes, vector: np.ndarray) -> None:
+        vector = np.asarray(vector, dtype=self.dtype).ravel()
+        if vector.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if (previous := self._entries.pop(key, None)) is not None:
+                self.size_bytes -= previous.nbytes
+            self._entries[key] = vector
+            self.size_bytes += vector.nbytes
+            while self.size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size_bytes -= evicted.nbytes
+
+    def metrics(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+        }
+
+
+class CachedEmbeddingModel:
+    """Embedding model wrapper which serves repeated texts from an `EmbeddingCache`.
+
+    `encode` takes a text or a list of texts like the wrapped model and returns a (n_texts, dim) array. Texts missing
+    from the cache are embedded in batches of up to `EMBEDDING_BATCH_SIZE`, sorted by length so that each batch holds
+    texts of similar length and little padding is added.
+    """
+
+    def __init__(self, model: Any, model_name: str, pooling_strategy: str, cache: EmbeddingCache):
+        self.model = model
+        self.model_name = model_name
+        self.pooling_strategy = pooling_strategy
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
+
+    def encode(self, inputs: str | list[str], to_numpy: bool = True, max_length: int | None = None) -> np.ndarray:
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        max_length = max_length or settings.EMBEDDING_MAX_TOKENS
+        keys = [self.cache.key(self.model_name, self.pooling_strategy, max_length, text) for text in texts]
+        vectors: list[np.ndarray | None] = [self.cache.get(key) for key in keys]
+
+        missing: dict[bytes, list[int]] = {}
+        for idx, (key, vector) in enumerate(zip(keys, vectors)):
+            if vector is None:
+                missing.setdefault(key, []).append(idx)
+        if missing:
+            # Identical texts are only embedded once.
+            order = sorted(missing.values(), key=lambda indices: len(texts[indices[0]]))
+            kwargs = {"max_length": max_length} if max_length else {}
+            for start in range(0, len(order), settings.EMBEDDING_BATCH_SIZE):
+                batch = order[start : start + settings.EMBEDDING_BATCH_SIZE]
+                embeddings = self.model.encode([texts[indices[0]] for indices in batch], to_numpy=True, **kwargs)
+                for indices, embedding in zip(batch, embeddings):
+                    self.cache.put(keys[indices[0]], embedding)
+                    for idx in indices:
+                        vectors[idx] = embedding
+
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([np.asarray(vector, dtype=np.float32).ravel() for vector in vectors])
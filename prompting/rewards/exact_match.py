@@ -1,3 +1,5 @@
+from typing import ClassVar
+
 import numpy as np
 
 from prompting.base.dendrite import DendriteResponseEvent
@@ -7,6 +9,8 @@ PENALTY_FACTOR = 0
 
 
 class ExactMatchRewardModel(BaseRewardModel):
+    dedup_completions: ClassVar[bool] = True
+
     def reward(self, reference: str, response_event: DendriteResponseEvent, **kwargs) -> BatchRewardOutput:
         """Gives an exact reward of 1 if the response matches the reference, 0 otherwise"""
         rewards = []
@@ -0,0 +1,98 @@
+"""Executors the reward models run on, see `BaseRewardModel.execution`.
+
+Pure-CPU reward models (regexes, sympy, date parsing, ROUGE) run in a pool of processes so they don't hold the GIL of
+the validator process, which also streams the miner responses. They receive a `CompletionsEvent` instead of the full
+`DendriteResponseEvent`, which keeps the pickled payload down to the completion strings. Embedding based reward
+models stay in-process on a single dedicated thread, next to the embedding model's weights.
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from loguru import logger
+
+from prompting import settings as settings_module
+
+RewardExecution = Literal["inline", "process", "embedding"]
+
+_lock = threading.Lock()
+_process_pool: ProcessPoolExecutor | None = None
+_embedding_executor: ThreadPoolExecutor | None = None
+_dispatch_executor: ThreadPoolExecutor | None = None
+
+
+@dataclass
+class CompletionsEvent:
+    """The parts of a `DendriteResponseEvent` which the CPU-bound reward models read."""
+
+    completions: list[str]
+    uids: list[int]
+
+
+def _init_reward_process(mode: str) -> None:
+    # Worker processes are spawned, so the settings have to be loaded again before any task is unpickled.
+    settings_module.settings = settings_module.Settings.load(mode=mode)
+
+
+def timed_reward(reward_model: Any, comparator: str, response_event: Any, kwargs: dict) -> tuple[Any, float]:
+    """Run `reward_model.reward` and return its output with the seconds it ran for, excluding any time queued."""
+    t0 = time.perf_counter()
+    output = reward_model.reward(comparator, response_event, **kwargs)
+    return output, time.perf_counter() - t0
+
+
+def reward_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    with _lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings_module.settings.REWARD_PROCESSES,
+                # Forking a process which holds CUDA contexts and logging locks is not safe.
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_reward_process,
+                initargs=(settings_module.settings.mode,),
+            )
+        return _process_pool
+
+
+def embedding_executor() -> ThreadPoolExecutor:
+    global _embedding_executor
+    with _lock:
+        if _embedding_executor is None:
+            _embedding_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+        return _embedding_executor
+
+
+def dispatch_executor() -> ThreadPoolExecutor:
+    """Threads the reward models of a task are applied from concurrently.
+
+    They mostly wait on the process pool or the embedding thread, so that the models of a task overlap.
+    """
+    global _dispatch_executor
+    with _lock:
+        if _dispatch_executor is None:
+            _dispatch_executor = ThreadPoolExecutor(
+                max_workers=settings_module.settings.REWARD_DISPATCH_THREADS, thread_name_prefix="reward"
+            )
+        return _dispatch_executor
+
+
+def submit_to_process(
+    reward_model: Any, comparator: str, completions: list[str], uids: list[int], kwargs: dict
+) -> Future:
+    event = CompletionsEvent(completions=completions, uids=uids)
+    return reward_process_pool().submit(timed_reward, reward_model, comparator, event, kwargs)
+
+
+def reset_process_pool() -> None:
+    """Drop a broken process pool so the next submission starts a new one."""
+    global _process_pool
+    with _lock:
+        if _process_pool is not None:
+            logger.warning("Reward process pool is broken, restarting it")
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
@@ -1,14 +1,55 @@
+import math
+import re
 import time
-from typing import List
+from functools import lru_cache
+from typing import ClassVar, List
 
 import numpy as np
 from sympy.parsing.sympy_parser import parse_expr
 
 from prompting.base.dendrite import DendriteResponseEvent
+from prompting.rewards.execution import RewardExecution
 from prompting.rewards.reward import BaseRewardModel, BatchRewardOutput
 
+# Maximum length of a token which is parsed as an expression.
+MAX_EXPRESSION_LENGTH = 32
+# Largest exponent of the single power an expression may contain.
+MAX_EXPONENT = 1000
+EXTRACTION_CACHE_SIZE = 4096
+# Names an expression may use besides numbers and arithmetic operators.
+EXPRESSION_NAMES = {"pi": math.pi, "sqrt": math.sqrt}
+
+_NUMBER = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_EXPRESSION = re.compile(r"(?:[\d+\-*/().eE]|pi|sqrt)+")
+_OPERAND = re.compile(r"\d|pi")
+_EXPONENT = re.compile(r"\*\*[+-]?(\d+(?:\.\d+)?)(?![\d.eE(])")
+
+
+def _bounded_powers(expression: str) -> bool:
+    """Whether `expression` has at most one power, whose exponent is a number no larger than `MAX_EXPONENT`.
+
+    Big integer powers are computed in C and can't be interrupted, so their size is bounded before evaluating them.
+    """
+    powers = expression.count("**")
+    if powers == 0:
+        return True
+    exponent = _EXPONENT.search(expression)
+    return powers == 1 and exponent is not None and float(exponent.group(1)) <= MAX_EXPONENT
+
+
+def _parse_expression(expression: str) -> float | None:
+    if not _bounded_powers(expression):
+        return None
+    try:
+        return float(parse_expr(expression, local_dict=dict(EXPRESSION_NAMES)))
+    except Exception:
+        return None
+
 
 class FloatDiffModel(BaseRewardModel):
+    execution: ClassVar[RewardExecution] = "process"
+    dedup_completions: ClassVar[bool] = True
+
     @property
     def name(self) -> str:
         return "float_diff"
@@ -17,20 +58,21 @@ class FloatDiffModel(BaseRewardModel):
         super().__init__()
 
     @staticmethod
+    @lru_cache(maxsize=EXTRACTION_CACHE_SIZE)
     def extract_number(text: str) -> float:
         """Extract a number from a string."""
         # loop over all words reversed and try to cast as a float, break when you find the first one
         words = text.split()
         for word in reversed(words):
             cleaned = word.strip(".").replace(",", "")
-            try:
-                return float(parse_expr(cleaned).evalf())
-            except Exception:
-                # fall back to simpler parsing if required
-                try:
-                    return float(cleaned)
-                except Exception:
-                    continue
+            # plain numbers, including ones with thousands separators or in scientific notation
+            if _NUMBER.fullmatch(cleaned):
+                return float(cleaned)
+            # only short tokens which look like arithmetic are handed to sympy
+            if len(cleaned) <= MAX_EXPRESSION_LENGTH and _EXPRESSION.fullmatch(cleaned) and _OPERAND.search(cleaned):
+                number = _parse_expression(cleaned)
+                if number is not None:
+                    return number
 
     @staticmethod
     def math_score(reference: str, completion: str) -> float:
@@ -1,16 +1,20 @@
 import json
 import re
 import time
+from typing import ClassVar
 
 import numpy as np
 from loguru import logger
 from pydantic import Field, model_validator
 
 from prompting.base.dendrite import DendriteResponseEvent
+from prompting.rewards.execution import RewardExecution
 from prompting.rewards.reward import BaseRewardModel, BatchRewardOutput
 
 
 class MultiChoiceRewardModel(BaseRewardModel):
+    execution: ClassVar[RewardExecution] = "process"
+    dedup_completions: ClassVar[bool] = True
     choices: tuple[str, ...] = Field(default=("A", "B", "C", "D"))
     json_penalty: float = Field(default=0.9)
     choice_map: dict[str, str] = Field(default={})
@@ -1,4 +1,5 @@
 import time
+from typing import ClassVar
 
 import numpy as np
 
@@ -9,6 +10,8 @@ NON_RESPONSE_PENALTY = 3
 
 
 class PenaltyModel(BaseRewardModel):
+    dedup_completions: ClassVar[bool] = True
+
     @property
     def name(self) -> str:
         return "penalty"
@@ -0,0 +1,112 @@
+"""Process-wide registry of the reward models and of the embedding model they share.
+
+Nothing heavy is loaded when the reward modules are imported: the embedding model is loaded on first use, or ahead of
+the first task by `warmup`, which the validator runs in the background at start. Every model lives once per process.
+"""
+
+import importlib
+import threading
+import time
+from typing import TYPE_CHECKING, Any, TypeVar
+
+import numpy as np
+from loguru import logger
+
+from prompting.rewards.embedding_cache import CachedEmbeddingModel, EmbeddingCache
+from prompting.settings import settings
+
+if TYPE_CHECKING:
+    from prompting.rewards.reward import BaseRewardModel
+
+EMBEDDING_MODEL_NAME = "WhereIsAI/UAE-Large-V1"
+POOLING_STRATEGY = "cls"
+WARMUP_TEXT = "The quick brown fox jumps over the lazy dog."
+# Imported by each reward worker process during warmup, see `BaseRewardModel.execution`.
+PROCESS_REWARD_MODULES = (
+    "prompting.rewards.date",
+    "prompting.rewards.float_diff",
+    "prompting.rewards.multi_choice",
+    "prompting.rewards.rouge",
+)
+
+RewardModelT = TypeVar("RewardModelT", bound="BaseRewardModel")
+
+
+def load_embedding_model() -> Any:
+    from angle_emb import AnglE
+
+    model = AnglE.from_pretrained(
+        EMBEDDING_MODEL_NAME, pooling_strategy=POOLING_STRATEGY, device=settings.NEURON_DEVICE
+    )
+    if settings.NEURON_DEVICE.startswith("cuda"):
+        # This line is necessary to pass the model to the device defined at its initialization
+        model = model.cuda()
+    return model
+
+
+def _warmup_worker() -> int:
+    for module in PROCESS_REWARD_MODULES:
+        importlib.import_module(module)
+    return len(PROCESS_REWARD_MODULES)
+
+
+class RewardModelRegistry:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._embedding_model: CachedEmbeddingModel | None = None
+        self._reward_models: dict[type, "BaseRewardModel"] = {}
+
+    def embedding_model(self) -> CachedEmbeddingModel:
+        """The embedding model shared by all embedding based reward models, loaded on the first call."""
+        if self._embedding_model is None:
+            with self._lock:
+                if self._embedding_model is None:
+                    t0 = time.time()
+                    self.set_embedding_model(load_embedding_model())
+                    logger.info(f"Loaded embedding model {EMBEDDING_MODEL_NAME} in {time.time() - t0:.2f}s")
+        return self._embedding_model
+
+    def set_embedding_model(self, model: Any, model_name: str = EMBEDDING_MODEL_NAME) -> None:
+        """Use `model`, anything with an AnglE-like `encode`, instead of loading the embedding model."""
+        self._embedding_model = CachedEmbeddingModel(
+            model,
+            model_name=model_name,
+            pooling_strategy=POOLING_STRATEGY,
+            cache=EmbeddingCache(
+                max_bytes=settings.EMBEDDING_CACHE_MAX_BYTES,
+                dtype=np.float16 if settings.EMBEDDING_CACHE_FLOAT16 else np.float32,
+            ),
+        )
+
+    def get(self, model_cls: type[RewardModelT]) -> RewardModelT:
+        """The shared instance of `model_cls` with its default parameters."""
+        if (model := self._reward_models.get(model_cls)) is None:
+            with self._lock:
+                if (model := self._reward_models.get(model_cls)) is None:
+                    model = self._reward_models[model_cls] = model_cls()
+        return model
+
+    def warmup(self) -> None:
+        """Load and run every heavy component once, so that the first task doesn't pay for their initialization.
+
+        The embedding model is loaded and embeds a text (CUDA kernels, tokenizer) and the reward worker processes are
+        started and import the CPU-bound reward models.
+        """
+        from prompting.rewards.execution import embedding_executor, reward_process_pool
+
+        t0 = time.time()
+        try:
+            # The embedding model runs on its dedicated thread, which also needs its CUDA context.
+            embedding_model = self.embedding_model()
+            embedding_executor().submit(embedding_model.model.encode, [WARMUP_TEXT], to_numpy=True).result()
+            pool = reward_process_pool()
+            for future in [pool.submit(_warmup_worker) for _ in range(settings.REWARD_PROCESSES)]:
+                future.result()
+        except Exception as ex:
+            # The models will be loaded by the first task instead.
+            logger.exception(f"Failed to warm up the reward models: {ex}")
+            return
+        logger.info(f"Reward models warmed up in {time.time() - t0:.2f}s")
+
+
+reward_registry = RewardModelRegistry()
@@ -1,30 +1,36 @@
 import time
-from typing import Optional
+from functools import lru_cache
+from typing import Any, ClassVar, Optional
 
 import numpy as np
-from angle_emb import AnglE
-from pydantic import ConfigDict, model_validator
-from scipy import spatial
+from pydantic import ConfigDict
 
 from prompting.base.dendrite import DendriteResponseEvent
+from prompting.rewards.embedding_cache import CachedEmbeddingModel
+from prompting.rewards.execution import RewardExecution
+from prompting.rewards.registry import reward_registry
 from prompting.rewards.reward import BaseRewardModel, BatchRewardOutput
-from prompting.settings import settings
+from prompting.rewards.similarity import cosine_similarity
 
-MODEL = AnglE.from_pretrained("WhereIsAI/UAE-Large-V1", pooling_strategy="cls", device=settings.NEURON_DEVICE)
-if settings.NEURON_DEVICE.startswith("cuda"):
-    # This line is necessary to pass the model to the device defined at its initialization
-    MODEL = MODEL.cuda()
+
+@lru_cache(maxsize=None)
+def empty_embedding(embedding_model: CachedEmbeddingModel) -> np.ndarray:
+    """Embedding of the empty string, the baseline a failed completion would score."""
+    return embedding_model.encode("", to_numpy=True).flatten()
 
 
 class RelevanceRewardModel(BaseRewardModel):
+    execution: ClassVar[RewardExecution] = "embedding"
+    dedup_completions: ClassVar[bool] = True
     threshold: Optional[float] = None
     model_config = ConfigDict(arbitrary_types_allowed=True)
-    embedding_model: Optional[AnglE] = None
+    # Overrides the shared embedding model of the registry when set.
+    embedding_model: Optional[Any] = None
 
-    @model_validator(mode="after")
-    def init_model(self) -> "RelevanceRewardModel":
-        self.embedding_model = MODEL
-        return self
+    @property
+    def encoder(self) -> CachedEmbeddingModel:
+        """The embedding model, loaded on first use."""
+        return self.embedding_model if self.embedding_model is not None else reward_registry.embedding_model()
 
     def reward(self, reference: str, response_event: DendriteResponseEvent, **kwargs) -> BatchRewardOutput:
         """Calculate the cosine similarity between sentence embeddings of the reference and completions.
@@ -33,32 +39,25 @@ class RelevanceRewardModel(BaseRewardModel):
         This is usually around 0.35. We also clip the rewards between 0 and 1.
         The maximum effective score is around 0.65.
         """
-        reference_embedding = self.embedding_model.encode(reference, to_numpy=True)
-        reference_emb_flatten = reference_embedding.flatten()
-        rewards: list[float] = []
-        timings: list[float] = []
+        reference_embedding = self.encoder.encode(reference, to_numpy=True)
         completions: list[str] = response_event.completions
+        rewards = np.zeros(len(completions))
+        timings = np.zeros(len(completions))
         # baseline is the cosine similarity between the reference and an empty string
-        baseline = 1 - float(
-            spatial.distance.cosine(reference_emb_flatten, self.embedding_model.encode("", to_numpy=True).flatten())
-        )
+        baseline = float(cosine_similarity(reference_embedding, empty_embedding(self.encoder))[0, 0])
 
-        for comp in completions:
-            if len(comp) == 0:
-                rewards.append(0)
-                timings.append(0)
-                continue
+        # All non-empty completions are embedded together, each is attributed an equal share of the time
+        non_empty = [idx for idx, comp in enumerate(completions) if len(comp) > 0]
+        if non_empty:
             t0 = time.time()
-            emb = self.embedding_model.encode(comp, to_numpy=True)
+            embeddings = self.encoder.encode([completions[idx] for idx in non_empty], to_numpy=True)
             # Calculate cosine similarity between reference and completion embeddings, and subtract baseline
-            score = 1 - float(spatial.distance.cosine(reference_emb_flatten, emb.flatten() - baseline))
-
-            rewards.append(score)
-            timings.append(time.time() - t0)
+            rewards[non_empty] = cosine_similarity(embeddings - baseline, reference_embedding)[:, 0]
+            timings[non_empty] = (time.time() - t0) / len(non_empty)
 
         output = BatchRewardOutput(
-            rewards=np.clip(np.array(rewards), 0, 1),
-            timings=np.array(timings),
+            rewards=np.clip(rewards, 0, 1),
+            timings=timings,
             threshold=self.threshold,
         )
 
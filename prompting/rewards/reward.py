@@ -1,11 +1,22 @@
 import time
 from abc import ABC, abstractmethod
+from concurrent.futures.process import BrokenProcessPool
 from typing import ClassVar, Literal
 
 import numpy as np
+from loguru import logger
 from pydantic import BaseModel, ConfigDict
 
 from prompting.base.dendrite import DendriteResponseEvent
+from prompting.rewards.execution import (
+    CompletionsEvent,
+    RewardExecution,
+    dispatch_executor,
+    embedding_executor,
+    reset_process_pool,
+    submit_to_process,
+    timed_reward,
+)
 from prompting.tasks.base_task import BaseTextTask
 
 RewardTypeLiteral = Literal["reward", "penalty"]
@@ -21,25 +32,31 @@ class WeightedRewardEvent(BaseModel):
     reward_model_type: RewardTypeLiteral
     batch_time: float
     uids: list[float]
+    # Part of `batch_time` spent waiting for an executor rather than computing the rewards.
+    queue_time: float = 0.0
 
     threshold: float | None = None
     extra_info: dict | None = None
     reward_type: Literal["reward", "penalty"] = "reward"
+    # Fraction of the completions which were duplicates of another one and not scored again.
+    dedup_ratio: float = 0.0
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     # implement custom asdict to return a dict with the same keys as the dataclass using the model name
     def asdict(self) -> dict:
         return {
-            f"{self.reward_model_name}_raw_{self.reward_model_type.value}": self.rewards,
-            f"{self.reward_model_name}_{self.reward_model_type.value}": self.rewards_normalized,
-            f"{self.reward_model_name}_{self.reward_model_type.value}_timings": self.timings,
-            f"{self.reward_model_name}_{self.reward_model_type.value}_batch_time": self.batch_time,
-            f"{self.reward_model_name}_{self.reward_model_type.value}_threshold": self.threshold,
-            f"{self.reward_model_name}_{self.reward_model_type.value}_extra_info": self.extra_info,
-            f"{self.reward_model_name}_{self.reward_model_type.value}_uids": self.uids,
-            f"{self.reward_model_name}_{self.reward_model_type.value}_task": self.task,
-            f"{self.reward_model_name}_{self.reward_model_type.value}_weight": self.weight,
+            f"{self.reward_model_name}_raw_{self.reward_model_type}": self.rewards,
+            f"{self.reward_model_name}_{self.reward_model_type}": self.rewards_normalized,
+            f"{self.reward_model_name}_{self.reward_model_type}_timings": self.timings,
+            f"{self.reward_model_name}_{self.reward_model_type}_batch_time": self.batch_time,
+            f"{self.reward_model_name}_{self.reward_model_type}_queue_time": self.queue_time,
+            f"{self.reward_model_name}_{self.reward_model_type}_dedup_ratio": self.dedup_ratio,
+            f"{self.reward_model_name}_{self.reward_model_type}_threshold": self.threshold,
+            f"{self.reward_model_name}_{self.reward_model_type}_extra_info": self.extra_info,
+            f"{self.reward_model_name}_{self.reward_model_type}_uids": self.uids,
+            f"{self.reward_model_name}_{self.reward_model_type}_task": self.task,
+            f"{self.reward_model_name}_{self.reward_model_type}_weight": self.weight,
         }
 
 
@@ -61,13 +78,71 @@ class BatchRewardOutput(BaseModel):
         return (self.rewards - self.rewards.min()) / (self.rewards.max() - self.rewards.min())
 
 
+class CompletionDedup:
+    """The unique completions of a response event, so that each is scored once per reward model.
+
+    `inverse[i]` is the index of the i-th completion in `event.completions`, the uid of a unique completion is the
+    uid of its first occurrence.
+    """
+
+    def __init__(self, response_event: DendriteResponseEvent):
+        index: dict[str, int] = {}
+        inverse: list[int] = []
+        uids: list[int] = []
+        for completion, uid in zip(response_event.completions, response_event.stream_results_uids.tolist()):
+            if completion not in index:
+                index[completion] = len(index)
+                uids.append(uid)
+            inverse.append(index[completion])
+        self.inverse = np.array(inverse, dtype=np.int64)
+        self.event = CompletionsEvent(completions=list(index), uids=uids)
+
+    @property
+    def ratio(self) -> float:
+        if len(self.inverse) == 0:
+            return 0.0
+        return 1 - len(self.event.completions) / len(self.inverse)
+
+    def scatter(self, output: BatchRewardOutput) -> BatchRewardOutput:
+        """Expand the output computed on the unique completions back to one entry per completion.
+
+        Every duplicate gets the reward and the timing of the completion it duplicates.
+        """
+        return output.model_copy(
+            update={"rewards": output.rewards[self.inverse], "timings": output.timings[self.inverse]}
+        )
+
+
 class BaseRewardModel(ABC, BaseModel):
     weight: float = 1.0
+    # Where `reward` runs: in the calling thread, in the reward process pool (pure-CPU models, which must only read
+    # `response_event.completions` and `response_event.uids`) or on the dedicated embedding thread.
+    execution: ClassVar[RewardExecution] = "inline"
+    # Whether the reward of a completion depends only on its text and the reference, so that identical completions
+    # can be scored once. Such models must only read `response_event.completions` and `response_event.uids`.
+    dedup_completions: ClassVar[bool] = False
 
     @abstractmethod
     def reward(self, reference: str, response_event: DendriteResponseEvent, **kwargs) -> BatchRewardOutput:
         raise NotImplementedError("You must implement the reward method")
 
+    def compute_reward(
+        self, comparator: str, response_event: DendriteResponseEvent, **kwargs
+    ) -> tuple[BatchRewardOutput, float]:
+        """Run `reward` on the executor of the model, return its output and the seconds `reward` itself took."""
+        if self.execution == "process":
+            future = submit_to_process(
+                self, comparator, list(response_event.completions), list(response_event.uids), kwargs
+            )
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                reset_process_pool()
+                return timed_reward(self, comparator, response_event, kwargs)
+        if self.execution == "embedding":
+            return embedding_executor().submit(timed_reward, self, comparator, response_event, kwargs).result()
+        return timed_reward(self, comparator, response_event, kwargs)
+
     def apply(
         self,
         response_event: DendriteResponseEvent,
@@ -75,11 +150,23 @@ class BaseRewardModel(ABC, BaseModel):
         challenge: str | None = None,
         reward_type: Literal["reward", "penalty"] = "reward",
         task: BaseTextTask | None = None,
+        dedup: CompletionDedup | None = None,
+        submitted_at: float | None = None,
         **kwargs,
     ) -> WeightedRewardEvent:
-        t0 = time.time()
+        """Score the completions of `response_event`.
+
+        `submitted_at` is the `time.time()` at which the caller queued this call, so that the time it waited is counted
+        in the batch and queue times.
+        """
+        t0 = time.time() if submitted_at is None else submitted_at
         comparator = reference if reward_type == "reward" else challenge
-        batch_rewards_output: BatchRewardOutput = self.reward(comparator, response_event, **kwargs)
+        if dedup is not None and self.dedup_completions:
+            batch_rewards_output, reward_time = self.compute_reward(comparator, dedup.event, **kwargs)
+            batch_rewards_output = dedup.scatter(batch_rewards_output)
+        else:
+            dedup = None
+            batch_rewards_output, reward_time = self.compute_reward(comparator, response_event, **kwargs)
         batch_rewards_time = time.time() - t0
 
         return WeightedRewardEvent(
@@ -90,10 +177,12 @@ class BaseRewardModel(ABC, BaseModel):
             rewards_normalized=batch_rewards_output.rewards_normalized,
             reward_model_type=reward_type,
             batch_time=batch_rewards_time,
+            queue_time=max(batch_rewards_time - reward_time, 0.0),
             threshold=batch_rewards_output.threshold,
             timings=batch_rewards_output.timings,
             extra_info=kwargs,
             uids=response_event.uids,
+            dedup_ratio=dedup.ratio if dedup is not None else 0.0,
         )
 
 
@@ -140,16 +229,31 @@ class BaseRewardConfig(ABC, BaseModel):
         model_id: str | None = None,
         task: BaseTextTask | None = None,
     ) -> list[WeightedRewardEvent]:
-        reward_events = []
-        for weighted_reward in cls.reward_definitions:
-            reward_events.append(
-                weighted_reward.apply(
-                    reference=reference,
-                    response_event=response_event,
-                    challenge=challenge,
-                    reward_type="reward",
-                    model_id=model_id,
-                    task=task,
-                ),
+        dedup = CompletionDedup(response_event)
+        logger.debug(
+            f"{len(dedup.event.completions)} unique of {len(dedup.inverse)} completions, dedup ratio {dedup.ratio:.2f}"
+        )
+        # The reward models share no state, so they run concurrently, each on its own executor. The events are
+        # returned in the order of `reward_definitions`.
+        submitted_at = time.time()
+        futures = [
+            dispatch_executor().submit(
+                weighted_reward.apply,
+                reference=reference,
+                response_event=response_event,
+                challenge=challenge,
+                reward_type="reward",
+                model_id=model_id,
+                task=task,
+                dedup=dedup,
+                submitted_at=submitted_at,
             )
+            for weighted_reward in cls.reward_definitions
+        ]
+        reward_events = [future.result() for future in futures]
+        timings = ", ".join(
+            f"{event.reward_model_name} {event.batch_time:.2f}s ({event.queue_time:.2f}s queued)"
+            for event in reward_events
+        )
+        logger.debug(f"Reward models applied: {timings}")
         return reward_events
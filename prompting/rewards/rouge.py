@@ -1,36 +1,42 @@
 import time
-from typing import List
+from typing import ClassVar, List
 
 import numpy as np
-from pydantic import ConfigDict
-from rouge import Rouge
+from pydantic import ConfigDict, Field
 
 from prompting.base.dendrite import DendriteResponseEvent
+from prompting.rewards.execution import RewardExecution
 from prompting.rewards.reward import BaseRewardModel, BatchRewardOutput
+from prompting.rewards.rouge_engine import RougeScorer
+from prompting.settings import settings
 
 
 class RougeRewardModel(BaseRewardModel):
+    execution: ClassVar[RewardExecution] = "process"
+    dedup_completions: ClassVar[bool] = True
     ngram: str = "rouge-l"  # TODO: Make proper literal
     metric: str = "f"  # TODO: Make proper literal
     avg: bool = False
-    rouge: Rouge = Rouge()
     name: str = "rouge"
+    max_tokens: int | None = Field(default_factory=lambda: settings.ROUGE_MAX_TOKENS)
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     def rouge_score(self, reference, completion):
         if not completion or not reference:
             return 0.0
-        return self.rouge.get_scores(reference, completion, avg=self.avg)[0][self.ngram][self.metric]
+        return RougeScorer(reference, max_tokens=self.max_tokens).score(completion, self.ngram)[self.metric]
 
     def reward(self, reference: str, response_event: DendriteResponseEvent, **kwargs) -> BatchRewardOutput:
         """Compute ROUGE scores given a completion and reference pair."""
         rewards = []
         timings = []
         completions: List[str] = response_event.completions
+        # The reference is tokenized once for all completions.
+        scorer = RougeScorer(reference, max_tokens=self.max_tokens) if reference else None
 
         for completion in completions:
             t0 = time.time()
-            rewards.append(self.rouge_score(reference, completion))
+            rewards.append(scorer.score(completion, self.ngram)[self.metric] if completion and scorer else 0.0)
             timings.append(time.time() - t0)
 
         output = BatchRewardOutput(
@@ -0,0 +1,138 @@
+"""ROUGE-L and ROUGE-N scores of many completions against one reference.
+
+The scores reproduce those of the `rouge` package (`Rouge().get_scores(hyp, ref)` with its default exclusive counting)
+where `hyp` is the reference given to `RougeScorer` and `ref` is the scored completion: texts are split into sentences
+on ".", ROUGE-L is computed at summary level from the union of the words of the sentence-level LCSs, and ROUGE-N
+counts distinct n-grams.
+
+The reference is tokenized once and its words are interned into integer ids. The LCS of each pair of sentences is
+computed with the bit-parallel algorithm of Hyyrö, which keeps one m-bit row per word instead of an n x m table of
+Python ints, and the LCS words are recovered from those rows with the same tie-breaking as the `rouge` package.
+"""
+
+from collections.abc import Iterable
+
+# Words missing from the reference can't be part of any LCS with it.
+_UNKNOWN = -1
+
+
+def split_sentences(text: str, max_tokens: int | None = None) -> list[list[str]]:
+    """Split `text` into sentences of words the way the `rouge` package does, keeping at most `max_tokens` words."""
+    sentences = [" ".join(sentence.split()).split(" ") for sentence in text.split(".") if len(sentence) > 0]
+    if max_tokens is None:
+        return sentences
+    capped: list[list[str]] = []
+    remaining = max_tokens
+    for words in sentences:
+        if remaining <= 0:
+            break
+        capped.append(words[:remaining])
+        remaining -= len(capped[-1])
+    return capped
+
+
+def _f_p_r(overlap: int, hyp_count: int, ref_count: int) -> dict[str, float]:
+    precision = overlap / hyp_count if hyp_count else 0.0
+    recall = overlap / ref_count if ref_count else 0.0
+    return {"f": 2.0 * ((precision * recall) / (precision + recall + 1e-8)), "p": precision, "r": recall}
+
+
+class _ReferenceSentence:
+    """A reference sentence as ids, with the bit mask of the positions of each id."""
+
+    def __init__(self, ids: list[int]):
+        self.ids = ids
+        self.length = len(ids)
+        self.full = (1 << self.length) - 1
+        self.match_masks: dict[int, int] = {}
+        for position, token_id in enumerate(ids):
+            self.match_masks[token_id] = self.match_masks.get(token_id, 0) | (1 << position)
+
+    def lcs_ids(self, ids: list[int]) -> set[int]:
+        """Ids of the words on the LCS path of `ids` (rows) against this sentence (columns).
+
+        Row i of the LCS table is encoded by the bit vector `rows[i]`: the LCS length of `ids[:i]` and the first j
+        words of the sentence is the number of zero bits among the low j bits.
+        """
+        vector = self.full
+        rows = [vector]
+        for token_id in ids:
+            matches = self.match_masks.get(token_id)
+            if matches:
+                shared = vector & matches
+                vector = ((vector + shared) | (vector - shared)) & self.full
+            rows.append(vector)
+        if rows[-1] == self.full:
+            return set()
+
+        def length(i: int, j: int) -> int:
+            return j - (rows[i] & ((1 << j) - 1)).bit_count()
+
+        words: set[int] = set()
+        i, j = len(ids), self.length
+        while i > 0 and j > 0:
+            if ids[i - 1] == self.ids[j - 1]:
+                words.add(ids[i - 1])
+                i -= 1
+                j -= 1
+            elif length(i - 1, j) > length(i, j - 1):
+                i -= 1
+            else:
+                j -= 1
+        return words
+
+
+class RougeScorer:
+    """Scores completions against a single reference, which is tokenized once."""
+
+    def __init__(self, reference: str, max_tokens: int | None = None):
+        self.max_tokens = max_tokens
+        self.vocabulary: dict[str, int] = {}
+        sentences = split_sentences(reference, max_tokens)
+        self.reference_ids = [[self._intern(word) for word in words] for words in sentences]
+        self.reference_sentences = [_ReferenceSentence(ids) for ids in self.reference_ids]
+        self.reference_words = {token_id for ids in self.reference_ids for token_id in ids}
+        self._ngrams: dict[int, set[tuple[int, ...]]] = {}
+
+    def _intern(self, word: str) -> int:
+        return self.vocabulary.setdefault(word, len(self.vocabulary))
+
+    def _ids(self, words: Iterable[str]) -> list[int]:
+        return [self.vocabulary.get(word, _UNKNOWN) for word in words]
+
+    @staticmethod
+    def _ngram_set(words: list, n: int) -> set[tuple]:
+        return {tuple(words[i : i + n]) for i in range(len(words) - n + 1)}
+
+    def rouge_l(self, completion: str) -> dict[str, float]:
+        sentences = split_sentences(completion, self.max_tokens)
+        if not sentences or not self.reference_sentences:
+            return _f_p_r(0, 0, 0)
+        union: set[int] = set()
+        for words in sentences:
+            ids = self._ids(words)
+            for reference_sentence in self.reference_sentences:
+                union |= reference_sentence.lcs_ids(ids)
+        completion_words = {word for words in sentences for word in words}
+        return _f_p_r(len(union), len(self.reference_words), len(completion_words))
+
+    def rouge_n(self, completion: str, n: int) -> dict[str, float]:
+        sentences = split_sentences(completion, self.max_tokens)
+        if not sentences or not self.reference_sentences:
+            return _f_p_r(0, 0, 0)
+        if n not in self._ngrams:
+            self._ngrams[n] = self._ngram_set([token_id for ids in self.reference_ids for token_id in ids], n)
+        reference_ngrams = self._ngrams[n]
+        # Words missing from the reference are kept as strings, they only need to be distinct from the ids.
+        completion_ids = [self.vocabulary.get(word, word) for words in sentences for word in words]
+        completion_ngrams = self._ngram_set(completion_ids, n)
+        return _f_p_r(len(reference_ngrams & completion_ngrams), len(reference_ngrams), len(completion_ngrams))
+
+    def score(self, completion: str, ngram: str = "rouge-l") -> dict[str, float]:
+        """Return the `f`, `p` and `r` scores for a `rouge-l` or `rouge-<n>` metric."""
+        if ngram == "rouge-l":
+            return self.rouge_l(completion)
+        return self.rouge_n(completion, int(ngram.removeprefix("rouge-")))
+
+    def score_many(self, completions: Iterable[str], ngram: str = "rouge-l") -> list[dict[str, float]]:
+        return [self.score(completion, ngram) for completion in completions]
@@ -1,19 +1,28 @@
 import asyncio
 import threading
-from dataclasses import dataclass
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 
 from loguru import logger
-from pydantic import ConfigDict
+from pydantic import ConfigDict, PrivateAttr
 
 from prompting import mutable_globals
 from prompting.base.dendrite import DendriteResponseEvent
 from prompting.base.loop_runner import AsyncLoopRunner
 from prompting.datasets.base import DatasetEntry
 from prompting.llms.model_manager import model_manager, model_scheduler
+from prompting.settings import settings
 from prompting.tasks.base_task import BaseTextTask
 from prompting.tasks.task_registry import TaskRegistry
 from prompting.utils.logging import RewardLoggingEvent, log_event
 
+# Seconds over which the scoring throughput is measured.
+THROUGHPUT_WINDOW = 300
+# Number of scored tasks the average time in queue is computed over.
+METRICS_HISTORY = 100
+
 
 @dataclass
 class ScoringConfig:
@@ -23,16 +32,23 @@ class ScoringConfig:
     block: int
     step: int
     task_id: str
+    created_at: float = field(default_factory=time.monotonic)
 
 
 class TaskScorer(AsyncLoopRunner):
     """The scoring manager maintains a queue of tasks & responses to score and then runs a scoring loop in a background thread.
     This scoring loop will score the responses once the LLM needed is loaded in the model_manager and log the rewards.
+    Each step drains every task that can be scored with the loaded models, not just one.
     """
 
     is_running: bool = False
     thread: threading.Thread = None
-    interval: int = 10
+    interval: int = 1
+
+    _executor: ThreadPoolExecutor | None = PrivateAttr(default=None)
+    _scored: int = PrivateAttr(default=0)
+    _completed_at: deque[float] = PrivateAttr(default_factory=deque)
+    _time_in_queue: deque[float] = PrivateAttr(default_factory=lambda: deque(maxlen=METRICS_HISTORY))
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -57,30 +73,27 @@ class TaskScorer(AsyncLoopRunner):
             )
         )
 
-    async def run_step(self) -> RewardLoggingEvent:
-        await asyncio.sleep(0.1)
-        # Only score responses for which the model is loaded
-        scorable = [
-            scoring_config
-            for scoring_config in mutable_globals.scoring_queue
-            if (scoring_config.task.llm_model in model_manager.active_models.keys())
-            or (scoring_config.task.llm_model is None)
-        ]
-        if len(scorable) == 0:
-            logger.debug("Nothing to score. Skipping scoring step.")
-            # Run a model_scheduler step to load a new model as there are no more tasks to be scored
-            if len(mutable_globals.scoring_queue) > 0:
-                await model_scheduler.run_step()
-            return
-        mutable_globals.scoring_queue.remove(scorable[0])
-        scoring_config: ScoringConfig = scorable.pop(0)
-
-        # here we generate the actual reference
-        scoring_config.task.make_reference(
-            dataset_entry=scoring_config.dataset_entry,
-        )
-
-        # and there we then calculate the reward
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=settings.SCORING_WORKERS, thread_name_prefix="scoring")
+        return self._executor
+
+    def metrics(self) -> dict[str, float]:
+        now = time.monotonic()
+        while self._completed_at and now - self._completed_at[0] > THROUGHPUT_WINDOW:
+            self._completed_at.popleft()
+        oldest = mutable_globals.scoring_queue.peek()
+        return {
+            "scored": self._scored,
+            "tasks_per_minute": len(self._completed_at) * 60 / THROUGHPUT_WINDOW,
+            "queue_length": len(mutable_globals.scoring_queue),
+            "oldest_queued_age": now - oldest.created_at if oldest else 0.0,
+            "avg_time_in_queue": sum(self._time_in_queue) / len(self._time_in_queue) if self._time_in_queue else 0.0,
+        }
+
+    def score(self, scoring_config: ScoringConfig) -> None:
+        """Compute the rewards for a task whose reference has been generated and log them."""
         reward_pipeline = TaskRegistry.get_task_reward(scoring_config.task)
         logger.debug(
             f"""{len(scoring_config.response.completions)} completions to score for task {scoring_config.task}"""
@@ -111,8 +124,50 @@ class TaskScorer(AsyncLoopRunner):
                 task_id=scoring_config.task_id,
             )
         )
-        logger.info("Adding scores to rewards_and_uids")
-        await asyncio.sleep(0.01)
+
+    async def run_step(self) -> None:
+        """Score everything in the queue whose model is loaded.
+
+        References are generated one by one on the loop since they need the loaded LLM, while the rewards are
+        computed on `SCORING_WORKERS` threads as soon as the reference of a task is ready.
+        """
+        await asyncio.sleep(0.1)
+        # Only score responses for which the model is loaded
+        loaded_models = list(model_manager.active_models.keys())
+        scorable: list[ScoringConfig] = []
+        while (scoring_config := mutable_globals.scoring_queue.pop_next(loaded_models)) is not None:
+            scorable.append(scoring_config)
+        if len(scorable) == 0:
+            logger.debug("Nothing to score. Skipping scoring step.")
+            # Run a model_scheduler step to load a new model as there are no more tasks to be scored
+            if len(mutable_globals.scoring_queue) > 0:
+                await model_scheduler.run_step()
+            return
+
+        loop = asyncio.get_running_loop()
+        scoring: list[tuple[ScoringConfig, asyncio.Future]] = []
+        for scoring_config in scorable:
+            self._time_in_queue.append(time.monotonic() - scoring_config.created_at)
+            try:
+                # here we generate the actual reference
+                scoring_config.task.make_reference(
+                    dataset_entry=scoring_config.dataset_entry,
+                )
+            except Exception as ex:
+                logger.exception(f"Failed to generate reference for task {scoring_config.task_id}: {ex}")
+                continue
+            # and there we then calculate the reward
+            scoring.append((scoring_config, loop.run_in_executor(self.executor, self.score, scoring_config)))
+            await asyncio.sleep(0.01)
+
+        results = await asyncio.gather(*[future for _, future in scoring], return_exceptions=True)
+        for (scoring_config, _), result in zip(scoring, results):
+            if isinstance(result, Exception):
+                logger.opt(exception=result).error(f"Failed to score task {scoring_config.task_id}: {result}")
+                continue
+            self._scored += 1
+            self._completed_at.append(time.monotonic())
+        logger.info(f"Scored {len(scoring)} tasks, adding scores to rewards_and_uids. Metrics: {self.metrics()}")
 
 
 class WeightSetter(AsyncLoopRunner):
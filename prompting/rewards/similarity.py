@@ -0,0 +1,33 @@
+"""Cosine similarity of many embeddings at once, for reward models comparing N completions with M references."""
+
+import numpy as np
+
+
+def normalize(embeddings: np.ndarray, dtype: np.dtype = np.float64) -> np.ndarray:
+    """Return the rows of `embeddings` scaled to unit length; all-zero rows stay zero.
+
+    `dtype` is the storage type of the result, e.g. float16 to halve the memory of a large matrix which is compared
+    many times.
+    """
+    embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float64))
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    normalized = np.divide(embeddings, norms, out=np.zeros_like(embeddings), where=norms > 0)
+    return normalized.astype(dtype, copy=False)
+
+
+def cosine_similarity(embeddings: np.ndarray, references: np.ndarray, dtype: np.dtype = np.float64) -> np.ndarray:
+    """Cosine similarity of each of the N `embeddings` with each of the M `references`, as an (N, M) float64 array.
+
+    Both inputs may be single vectors or matrices with one embedding per row. Each side is normalised once and all
+    similarities are computed in a single matrix product.
+    """
+    embeddings = normalize(embeddings, dtype=dtype)
+    references = normalize(references, dtype=dtype)
+    return (embeddings @ references.T).astype(np.float64, copy=False)
+
+
+def paired_cosine_similarity(embeddings: np.ndarray, others: np.ndarray, dtype: np.dtype = np.float64) -> np.ndarray:
+    """Cosine similarity of each row of `embeddings` with the same row of `others`, as an (N,) float64 array."""
+    embeddings = normalize(embeddings, dtype=dtype)
+    others = normalize(others, dtype=dtype)
+    return np.einsum("ij,ij->i", embeddings, others, dtype=np.float64)
@@ -4,6 +4,7 @@ import numpy as np
 
 from prompting.base.dendrite import DendriteResponseEvent
 from prompting.rewards.reward import BaseRewardModel, BatchRewardOutput
+from prompting.utils.tokens import count_tokens_per_chunk
 
 
 class StreamingRewardModel(BaseRewardModel):
@@ -13,26 +14,21 @@ class StreamingRewardModel(BaseRewardModel):
     def name(self) -> str:
         return "streaming"
 
-    def __init__(self, max_tokens_per_chunk: int, **kwargs):
-        super().__init__()
-        self.max_tokens_per_chunk = max_tokens_per_chunk
-
     def reward(self, _: str, response_event: DendriteResponseEvent) -> BatchRewardOutput:
-        """Compute difference scores given a completion and reference pair."""
         """Compute difference scores given a completion and reference pair."""
         rewards = []
         timings = []
         penalty_per_exceeding_chunk = 0.25
+        # Chunks are only tokenized for this reward, so the counts are computed here rather than when collected.
+        count_tokens_per_chunk(response_event.stream_results)
 
         # Iterate through each chunk of response tokens
         for response_tokens_per_chunks in response_event.stream_results_all_tokens_per_chunk:
             start_time = time.time()
 
             # Calculate the accumulated penalty for the current chunk
-            accumulated_penalty = sum(
-                penalty_per_exceeding_chunk if tokens_per_chunk > self.max_tokens_per_chunk else 0
-                for tokens_per_chunk in response_tokens_per_chunks
-            )
+            exceeding_chunks = np.count_nonzero(np.asarray(response_tokens_per_chunks) > self.max_tokens_per_chunk)
+            accumulated_penalty = penalty_per_exceeding_chunk * exceeding_chunks
 
             # Record the timing for this computation
             timings.append(time.time() - start_time)
@@ -10,97 +10,142 @@ Example response:
 
 import json
 import time
+from typing import Any
 
 import numpy as np
 from loguru import logger
-from scipy import spatial
 
 from prompting.base.dendrite import DendriteResponseEvent
-from prompting.datasets.random_website import DDGDataset, DDGDatasetEntry
+from prompting.datasets.random_website import DDGDatasetEntry
 from prompting.rewards.relevance import RelevanceRewardModel
 from prompting.rewards.reward import BatchRewardOutput
+from prompting.rewards.similarity import cosine_similarity, paired_cosine_similarity
+from prompting.utils.web_scraper import web_scraper
 
 _SEARCH_TERM_THRESH = 0.2
 _VALID_URL_SCORE = 0.8
 
 
 class WebRetrievalRewardModel(RelevanceRewardModel):
-    def _cosine_similarity(self, content1: str, content2: str) -> float:
-        """Calculate the cosine similarity between sentence embeddings of the reference and completions."""
-        reference_emb_flatten = self.embedding_model.encode(content1, to_numpy=True).flatten()
-        response_emb_flatten = self.embedding_model.encode(content2, to_numpy=True).flatten()
-        return 1.0 - float(spatial.distance.cosine(reference_emb_flatten, response_emb_flatten))
+    def _response_urls(self, completions: list[str]) -> list[str]:
+        urls = (self._parse_response(completion)[0] for completion in completions if completion)
+        return [url for url in urls if isinstance(url, str) and url]
+
+    def compute_reward(
+        self, comparator: str, response_event: DendriteResponseEvent, **kwargs
+    ) -> tuple[BatchRewardOutput, float]:
+        # The websites are scraped in the scorer's thread before the embedding thread is taken, so that slow websites
+        # don't hold up the other embedding based reward models.
+        t0 = time.perf_counter()
+        scraped_contents = web_scraper.fetch_many(self._response_urls(response_event.completions))
+        scrape_time = time.perf_counter() - t0
+        output, reward_time = super().compute_reward(
+            comparator, response_event, scraped_contents=scraped_contents, **kwargs
+        )
+        return output, scrape_time + reward_time
 
     # TODO: Change base class reference type to Reference pydantic model, in order to store additional data.
-    def reward(self, reference: str, response_event: DendriteResponseEvent, **kwargs) -> BatchRewardOutput:
-        """Score response website content and URL based on the similarity to the search term and reference content."""
-        rewards: list[float] = []
-        timings: list[float] = []
-        for completion in response_event.completions:
-            timer_start = time.perf_counter()
-
+    def reward(
+        self,
+        reference: str,
+        response_event: DendriteResponseEvent,
+        scraped_contents: dict[str, str | None] | None = None,
+        **kwargs: Any,
+    ) -> BatchRewardOutput:
+        """Score response website content and URL based on the similarity to the search term and reference content.
+
+        `scraped_contents` maps the URLs of the completions to their content; the websites missing from it are scraped
+        here, all at once.
+        """
+        t0 = time.perf_counter()
+        completions: list[str] = response_event.completions
+        rewards = np.zeros(len(completions))
+        scraped_contents = dict(scraped_contents or {})
+        if missing := [url for url in self._response_urls(completions) if url not in scraped_contents]:
+            scraped_contents.update(web_scraper.fetch_many(missing))
+
+        # Completions which provide a URL and content, and whose website could be scraped.
+        valid: list[int] = []
+        contents: list[str] = []
+        relevants: list[str | None] = []
+        scraped: list[str] = []
+        for idx, completion in enumerate(completions):
             if not completion:
-                timings.append(time.perf_counter() - timer_start)
-                rewards.append(0)
                 continue
-
-            # URL and the content provided in the completion.
             response_url, response_content, response_relevant = self._parse_response(completion)
-            if response_url is None or response_content is None:
-                timings.append(time.perf_counter() - timer_start)
-                rewards.append(0)
+            if not isinstance(response_url, str) or not isinstance(response_content, str):
                 continue
-
-            # Content scraped from the URL provided in the completion.
-            response_url_scraped = DDGDataset.extract_website_content(response_url)
-            if not response_url_scraped or len(response_url_scraped) == 0:
+            if not (response_url_scraped := scraped_contents.get(response_url)):
                 logger.debug(f"Failed to extract miner's content from website: {response_url}")
-                timings.append(time.perf_counter() - timer_start)
-                rewards.append(0)
                 continue
+            valid.append(idx)
+            contents.append(response_content)
+            relevants.append(response_relevant if isinstance(response_relevant, str) else None)
+            scraped.append(response_url_scraped)
 
+        if valid:
             dataset_entry = DDGDatasetEntry.model_validate_json(json.loads(reference))
-            search_term = dataset_entry.search_term
-            reference_content = dataset_entry.website_content
-
-            # Similarity between search term and miner's scraped content.
-            search_response_sim = self._cosine_similarity(content1=search_term, content2=response_content)
-
-            # Similarity between search term and relevant section of content.
-            search_relevant_sim = 0
-            if response_relevant is not None:
-                search_relevant_sim = self._cosine_similarity(content1=search_term, content2=response_relevant)
-
-            # If the URL provided in the completion is valid.
-            valid_url_score = 0
-            if response_url_scraped is not None:
-                valid_url_score = self._cosine_similarity(content1=response_content, content2=response_url_scraped)
+            with_relevant = [i for i, relevant in enumerate(relevants) if relevant is not None]
+            # The search term, the reference and all the texts of the miners are embedded in one batched call.
+            embeddings = self.encoder.encode(
+                [
+                    dataset_entry.search_term,
+                    dataset_entry.website_content,
+                    *contents,
+                    *scraped,
+                    *(relevants[i] for i in with_relevant),
+                ],
+                to_numpy=True,
+            )
+            search_embedding, reference_embedding = embeddings[0], embeddings[1]
+            content_embeddings = embeddings[2 : 2 + len(valid)]
+            scraped_embeddings = embeddings[2 + len(valid) : 2 + 2 * len(valid)]
+            relevant_embeddings = embeddings[2 + 2 * len(valid) :]
 
             # Similarity between search term and reference content.
-            search_reference_sim = self._cosine_similarity(content1=search_term, content2=reference_content)
-            score = (search_response_sim + valid_url_score + search_relevant_sim) / 3
-            if abs(search_response_sim - search_reference_sim) > _SEARCH_TERM_THRESH:
+            search_reference_sim = float(cosine_similarity(search_embedding, reference_embedding)[0, 0])
+            # Similarity between search term and miner's content.
+            search_response_sim = cosine_similarity(content_embeddings, search_embedding)[:, 0]
+            # Similarity between search term and relevant section of content.
+            search_relevant_sim = np.zeros(len(valid))
+            if with_relevant:
+                search_relevant_sim[with_relevant] = cosine_similarity(relevant_embeddings, search_embedding)[:, 0]
+            # Similarity between the miner's content and the content scraped from its URL.
+            valid_url_score = paired_cosine_similarity(content_embeddings, scraped_embeddings)
+
+            scores = (search_response_sim + valid_url_score + search_relevant_sim) / 3
+            search_term_mismatch = np.abs(search_response_sim - search_reference_sim) > _SEARCH_TERM_THRESH
+            invalid_url = ~search_term_mismatch & (valid_url_score < _VALID_URL_SCORE)
+            relevant_too_long = (
+                ~search_term_mismatch
+                & ~invalid_url
+                & np.array(
+                    [rel is not None and len(rel) > len(content) for rel, content in zip(relevants, contents)],
+                    dtype=bool,
+                )
+            )
+            for i in np.flatnonzero(search_term_mismatch):
                 logger.info(
                     f"Response and reference scraped content relevance to the search term exceeds the threshold. "
-                    f"Similarity: response = {search_response_sim:.2f}; reference = {search_reference_sim:.2f}"
+                    f"Similarity: response = {search_response_sim[i]:.2f}; reference = {search_reference_sim:.2f}"
                 )
-                score = 0
-            elif valid_url_score < _VALID_URL_SCORE:
+            for i in np.flatnonzero(invalid_url):
                 # If provided URL does not contain content.
                 logger.info(
-                    f"Search term is not relevant to the scraped content, similarity {valid_url_score} < {_VALID_URL_SCORE}"
+                    f"Search term is not relevant to the scraped content, "
+                    f"similarity {valid_url_score[i]} < {_VALID_URL_SCORE}"
                 )
-                score = 0
-            elif response_relevant is not None and len(response_relevant) > len(response_content):
+            for i in np.flatnonzero(relevant_too_long):
                 logger.info(
                     "Relevant section is longer than the whole website content "
-                    f"{len(response_relevant)} > {len(response_content)}"
+                    f"{len(relevants[i])} > {len(contents[i])}"
                 )
-                score = 0
-            timings.append(time.perf_counter() - timer_start)
-            rewards.append(score)
+            scores[search_term_mismatch | invalid_url | relevant_too_long] = 0
+            rewards[valid] = scores
 
-        return BatchRewardOutput(rewards=np.array(rewards), timings=np.array(timings))
+        # The batch is scored at once, each completion is attributed an equal share of the time.
+        timings = np.full(len(completions), (time.perf_counter() - t0) / max(len(completions), 1))
+        return BatchRewardOutput(rewards=rewards, timings=timings)
 
     @staticmethod
     def _parse_response(completion: str) -> tuple[str | None, ...]:
@@ -40,6 +40,13 @@ class Settings(BaseSettings):
 
     # Neuron parameters.
     NEURON_TIMEOUT: int = Field(15, env="NEURON_TIMEOUT")
+    NEURON_CONNECT_TIMEOUT: float = Field(5, env="NEURON_CONNECT_TIMEOUT")
+    NEURON_FIRST_BYTE_TIMEOUT: float = Field(10, env="NEURON_FIRST_BYTE_TIMEOUT")
+    NEURON_READ_TIMEOUT: float = Field(10, env="NEURON_READ_TIMEOUT")
+    NEURON_MIN_TIMEOUT: float = Field(1, env="NEURON_MIN_TIMEOUT")
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = Field(3, env="CIRCUIT_BREAKER_FAILURE_THRESHOLD")
+    CIRCUIT_BREAKER_BACKOFF: float = Field(60, env="CIRCUIT_BREAKER_BACKOFF")
+    CIRCUIT_BREAKER_MAX_BACKOFF: float = Field(3600, env="CIRCUIT_BREAKER_MAX_BACKOFF")
     NEURON_DISABLE_SET_WEIGHTS: bool = Field(False, env="NEURON_DISABLE_SET_WEIGHTS")
     NEURON_MOVING_AVERAGE_ALPHA: float = Field(0.1, env="NEURON_MOVING_AVERAGE_ALPHA")
     NEURON_DECAY_ALPHA: float = Field(0.001, env="NEURON_DECAY_ALPHA")
@@ -49,8 +56,22 @@ class Settings(BaseSettings):
     NEURON_QUERY_UNIQUE_IPS: bool = Field(False, env="NEURON_QUERY_UNIQUE_IPS")
     NEURON_FORWARD_MAX_TIME: int = Field(240, env="NEURON_FORWARD_MAX_TIME")
     NEURON_MAX_TOKENS: int = Field(512, env="NEURON_MAX_TOKENS")
+    NEURON_QUORUM: float = Field(0.8, env="NEURON_QUORUM")
+    NEURON_QUORUM_DEADLINE: float = Field(10, env="NEURON_QUORUM_DEADLINE")
     REWARD_STEEPNESS: float = Field(0.7, env="STEEPNESS")
 
+    # Pooled miner HTTP clients.
+    AXON_CLIENT_MAX_CONNECTIONS: int = Field(4, env="AXON_CLIENT_MAX_CONNECTIONS")
+    AXON_CLIENT_MAX_KEEPALIVE: int = Field(2, env="AXON_CLIENT_MAX_KEEPALIVE")
+    AXON_CLIENT_IDLE_TIMEOUT: float = Field(300, env="AXON_CLIENT_IDLE_TIMEOUT")
+    EPISTULA_SIGNING_WORKERS: int = Field(4, env="EPISTULA_SIGNING_WORKERS")
+
+    # Outbound miner request scheduling.
+    OUTBOUND_MAX_CONCURRENCY: int = Field(256, env="OUTBOUND_MAX_CONCURRENCY")
+    OUTBOUND_ORGANIC_QUOTA: int = Field(64, env="OUTBOUND_ORGANIC_QUOTA")
+    OUTBOUND_INFERENCE_QUOTA: int = Field(200, env="OUTBOUND_INFERENCE_QUOTA")
+    OUTBOUND_AVAILABILITY_QUOTA: int = Field(32, env="OUTBOUND_AVAILABILITY_QUOTA")
+
     # Organic.
     ORGANIC_TIMEOUT: int = Field(30, env="ORGANIC_TIMEOUT")
     ORGANIC_SAMPLE_SIZE: int = Field(5, env="ORGANIC_SAMPLE_SIZE")
@@ -65,6 +86,26 @@ class Settings(BaseSettings):
     ORGANIC_SCALING_FACTOR: int = Field(1, env="ORGANIC_SCALING_FACTOR")
     TASK_QUEUE_LENGTH_THRESHOLD: int = Field(10, env="TASK_QUEUE_LENGTH_THRESHOLD")
     SCORING_QUEUE_LENGTH_THRESHOLD: int = Field(10, env="SCORING_QUEUE_LENGTH_THRESHOLD")
+    SCORING_WORKERS: int = Field(4, env="SCORING_WORKERS")
+    # Seconds after which the model of the oldest queued task is loaded, whatever the size of its backlog.
+    SCORING_MAX_TASK_AGE: float = Field(1800, env="SCORING_MAX_TASK_AGE")
+    REWARD_PROCESSES: int = Field(2, env="REWARD_PROCESSES")
+    REWARD_DISPATCH_THREADS: int = Field(16, env="REWARD_DISPATCH_THREADS")
+    EMBEDDING_BATCH_SIZE: int = Field(32, env="EMBEDDING_BATCH_SIZE")
+    # Token limit for embedded texts, None keeps the embedding model's own limit.
+    EMBEDDING_MAX_TOKENS: Optional[int] = Field(None, env="EMBEDDING_MAX_TOKENS")
+    EMBEDDING_CACHE_MAX_BYTES: int = Field(256 * 1024**2, env="EMBEDDING_CACHE_MAX_BYTES")
+    EMBEDDING_CACHE_FLOAT16: bool = Field(False, env="EMBEDDING_CACHE_FLOAT16")
+    # Load the reward models in the background when the validator starts rather than on the first task.
+    REWARD_WARMUP: bool = Field(True, env="REWARD_WARMUP")
+    # Number of words of a text ROUGE is computed on.
+    ROUGE_MAX_TOKENS: Optional[int] = Field(4096, env="ROUGE_MAX_TOKENS")
+    # Deadline for scraping all the websites returned by the miners for one web retrieval task.
+    WEB_SCRAPE_TIMEOUT: float = Field(30, env="WEB_SCRAPE_TIMEOUT")
+    WEB_SCRAPE_REQUEST_TIMEOUT: float = Field(10, env="WEB_SCRAPE_REQUEST_TIMEOUT")
+    WEB_SCRAPE_CONCURRENCY: int = Field(32, env="WEB_SCRAPE_CONCURRENCY")
+    WEB_SCRAPE_CACHE_SIZE: int = Field(4096, env="WEB_SCRAPE_CACHE_SIZE")
+    WEB_SCRAPE_CACHE_TTL: float = Field(3600, env="WEB_SCRAPE_CACHE_TTL")
     HF_TOKEN: Optional[str] = Field(None, env="HF_TOKEN")
 
     # Additional Fields.
@@ -0,0 +1,162 @@
+"""Extraction and parsing of the dates used by the date QA task and its reward.
+
+All regexes are compiled once at import. `parse_date` parses exactly the formats `DATE_REGEX` matches, with the
+same interpretation `pd.to_datetime` gives them, so no general purpose date parser is needed when scoring.
+"""
+
+import datetime
+import re
+
+import numpy as np
+
+_MONTHS = (
+    r"Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?"
+    r"|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?"
+)
+# The day first alternative doesn't accept "Dec", as it always has.
+_MONTHS_DAY_FIRST = _MONTHS.replace("Dec(?:ember)?", "Dec(?:ember)")
+
+DATE_REGEX = re.compile(
+    rf"\b\d{{1,2}}[-/]\d{{1,2}}[-/]\d{{2,4}}\b"
+    rf"|\b(?:{_MONTHS})\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,)?\s+\d{{4}}\b"
+    rf"|\b\d{{1,2}}\s+(?:{_MONTHS_DAY_FIRST})\s+\d{{4}}\b"
+    rf"|\b\d{{4}}\b"
+)
+# Dates without a year, e.g. "March 3rd".
+SECONDARY_DATE_REGEX = re.compile(rf"\b(?:{_MONTHS})\s+\d{{1,2}}(?:st|nd|rd|th)?\b")
+SENTENCE_SPLIT_REGEX = re.compile(r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s")
+YEAR_REGEX = re.compile(r"\b\d{3,4}\b")
+
+_NUMERIC_DATE = re.compile(r"(\d{1,2})[-/](\d{1,2})[-/](\d{2,4})")
+_MONTH_FIRST_DATE = re.compile(r"([A-Za-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})")
+_DAY_FIRST_DATE = re.compile(r"(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})")
+_YEAR = re.compile(r"\d{4}")
+_MONTH_NUMBERS = {
+    name: number
+    for number, names in enumerate(
+        [
+            ("jan", "january"),
+            ("feb", "february"),
+            ("mar", "march"),
+            ("apr", "april"),
+            ("may",),
+            ("jun", "june"),
+            ("jul", "july"),
+            ("aug", "august"),
+            ("sep", "september"),
+            ("oct", "october"),
+            ("nov", "november"),
+            ("dec", "december"),
+        ],
+        start=1,
+    )
+    for name in names
+}
+# The range of dates pandas timestamps can represent, pd.to_datetime fails outside of it.
+_MIN_DATE = datetime.date(1677, 9, 22)
+_MAX_DATE = datetime.date(2262, 4, 11)
+
+DATE_NOT_FOUND_CODE = 9999
+
+
+def split_sentences(text: str) -> list[str]:
+    return SENTENCE_SPLIT_REGEX.split(text)
+
+
+def find_date(text: str) -> str | None:
+    """Return the first date of the first sentence containing one."""
+    for sentence in split_sentences(text):
+        if match := DATE_REGEX.search(sentence):
+            return match.group()
+    return None
+
+
+def extract_date_and_sentence(text: str) -> tuple[str, str] | None:
+    """Return the first date in `text` and its sentence with the date replaced by "<date>".
+
+    Dates with a year are preferred, dates without one are only looked for if there are none.
+    """
+    sentences = split_sentences(text)
+    for regex in (DATE_REGEX, SECONDARY_DATE_REGEX):
+        for sentence in sentences:
+            if match := regex.search(sentence):
+                date = match.group()
+                return date, sentence.replace(date, "<date>").strip()
+    return None
+
+
+def _two_digit_year(year: int) -> int:
+    # Years are placed within 50 years of the current one, as dateutil does.
+    this_year = datetime.date.today().year
+    year += this_year // 100 * 100
+    if year >= this_year + 50:
+        year -= 100
+    elif year < this_year - 50:
+        year += 100
+    return year
+
+
+def parse_date(date: str) -> datetime.date | None:
+    """Parse a date matched by `DATE_REGEX`, or return None if it is invalid or pandas couldn't represent it.
+
+    Numeric dates are read month first unless the first number can't be a month, and a bare year is the first of
+    January of that year.
+    """
+    try:
+        if match := _NUMERIC_DATE.fullmatch(date):
+            first, second, year_digits = match.groups()
+            first, second, year = int(first), int(second), int(year_digits)
+            month, day = (first, second) if first <= 12 else (second, first)
+            if len(year_digits) == 2:
+                year = _two_digit_year(year)
+        elif match := _MONTH_FIRST_DATE.fullmatch(date):
+            month, day, year = _MONTH_NUMBERS[match.group(1).lower()], int(match.group(2)), int(match.group(3))
+        elif match := _DAY_FIRST_DATE.fullmatch(date):
+            day, month, year = int(match.group(1)), _MONTH_NUMBERS[match.group(2).lower()], int(match.group(3))
+        elif _YEAR.fullmatch(date):
+            day, month, year = 1, 1, int(date)
+        else:
+            return None
+        parsed = datetime.date(year, month, day)
+    except (KeyError, ValueError):
+        return None
+    return parsed if _MIN_DATE <= parsed <= _MAX_DATE else None
+
+
+def _date_diff(reference_date: str, parsed_reference: datetime.date | None, completion_date: str) -> int:
+    if reference_date.isdigit():
+        if match := YEAR_REGEX.search(completion_date):
+            return abs(int(reference_date) - int(match.group())) * 365
+        return DATE_NOT_FOUND_CODE
+    parsed_completion = parse_date(completion_date)
+    if parsed_reference is None or parsed_completion is None:
+        return 0 if reference_date == completion_date else DATE_NOT_FOUND_CODE
+    return abs((parsed_reference - parsed_completion).days)
+
+
+def date_diff(reference_date: str | None, completion_date: str | None) -> int:
+    """Absolute difference in days between two dates found by `find_date`.
+
+    If the reference is only a year, the first 3 or 4 digit number of the completion's date is compared with it.
+    Dates which can't be parsed only match themselves.
+    """
+    if not completion_date or not reference_date:
+        return DATE_NOT_FOUND_CODE
+    return _date_diff(reference_date, parse_date(reference_date), completion_date)
+
+
+def date_scores(reference: str, completions: list[str]) -> np.ndarray:
+    """Score each completion by how close its first date is to the reference's, 1 for the same date.
+
+    The reference is parsed once, the scores are exp(-days^2 / 1000) with scores below 0.001 clipped to 0.
+    """
+    diffs = np.full(len(completions), DATE_NOT_FOUND_CODE, dtype=np.float64)
+    if not (reference_date := find_date(reference)):
+        return np.zeros(len(completions))
+    parsed_reference = parse_date(reference_date)
+    for idx, completion in enumerate(completions):
+        if completion and (completion_date := find_date(completion)):
+            diffs[idx] = _date_diff(reference_date, parsed_reference, completion_date)
+    scores = np.exp(-(diffs**2) / 1000)
+    scores[scores < 0.001] = 0
+    return scores
@@ -1,6 +1,6 @@
 import json
 import os
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, is_dataclass
 from datetime import datetime, timedelta
 from typing import Any, Literal
 
@@ -233,5 +233,14 @@ def unpack_events(event: BaseEvent) -> dict[str, Any]:
     return event_dict
 
 
-def convert_arrays_to_lists(data: dict) -> dict:
-    return {key: value.tolist() if hasattr(value, "tolist") else value for key, value in data.items()}
+def convert_arrays_to_lists(data: Any) -> Any:
+    """Convert the numpy arrays, `array.array`s and dataclasses at any depth of `data` to lists and dicts."""
+    if isinstance(data, dict):
+        return {key: convert_arrays_to_lists(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [convert_arrays_to_lists(value) for value in data]
+    if is_dataclass(data) and not isinstance(data, type):
+        return convert_arrays_to_lists(asdict(data))
+    if hasattr(data, "tolist"):
+        return data.tolist()
+    return data
@@ -0,0 +1,58 @@
+import itertools
+import threading
+from collections import OrderedDict, defaultdict, deque
+from typing import Any, Collection, Iterator
+
+from prompting.llms.model_zoo import ModelConfig
+
+
+class ScoringQueue:
+    """FIFO queue of tasks waiting to be scored, indexed by the model needed to generate their reference.
+
+    Each model has its own deque and a global ordered dict keeps the overall arrival order, so getting the oldest
+    item scorable with a set of loaded models and removing it are O(1) in the queue length. Items are appended from
+    the validator thread and consumed on the scoring loop, hence the lock.
+    """
+
+    def __init__(self):
+        self._by_model: dict[ModelConfig | None, deque[tuple[int, Any]]] = defaultdict(deque)
+        self._order: OrderedDict[int, Any] = OrderedDict()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __iter__(self) -> Iterator[Any]:
+        with self._lock:
+            return iter(list(self._order.values()))
+
+    def append(self, scoring_config: Any) -> None:
+        with self._lock:
+            sequence = next(self._sequence)
+            self._by_model[scoring_config.task.llm_model].append((sequence, scoring_config))
+            self._order[sequence] = scoring_config
+
+    def peek(self) -> Any | None:
+        """Return the oldest queued item without removing it."""
+        with self._lock:
+            return next(iter(self._order.values()), None)
+
+    def pop_next(self, models: Collection[ModelConfig]) -> Any | None:
+        """Remove and return the oldest item which needs one of `models` or no model at all."""
+        with self._lock:
+            oldest: deque[tuple[int, Any]] | None = None
+            for model in itertools.chain([None], models):
+                queue = self._by_model.get(model)
+                if queue and (oldest is None or queue[0][0] < oldest[0][0]):
+                    oldest = queue
+            if oldest is None:
+                return None
+            sequence, scoring_config = oldest.popleft()
+            del self._order[sequence]
+            return scoring_config
+
+    def backlog(self) -> dict[ModelConfig | None, int]:
+        """Number of queued items per model."""
+        with self._lock:
+            return {model: len(queue) for model, queue in self._by_model.items() if queue}
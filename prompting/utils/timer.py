@@ -1,4 +1,8 @@
 import time
+from array import array
+from dataclasses import dataclass
+
+import numpy as np
 
 
 class Timer:
@@ -9,3 +13,46 @@ class Timer:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.end_time = time.perf_counter()
         self.elapsed_time = self.end_time - self.start_time
+
+
+@dataclass
+class StreamTimingStats:
+    """Summary of a stream's chunk timings, all in seconds since the request was sent."""
+
+    ttft: float = 0.0
+    inter_chunk_p50: float = 0.0
+    inter_chunk_p95: float = 0.0
+    total_time: float = 0.0
+    n_chunks: int = 0
+
+
+class ChunkTimer:
+    """Records the arrival time of each chunk of a stream with the monotonic nanosecond clock.
+
+    Timings are stored as seconds since `start` in a compact `array('d')` rather than a list of boxed floats.
+    """
+
+    __slots__ = ("start_ns", "timings")
+
+    def __init__(self):
+        self.start_ns = time.perf_counter_ns()
+        self.timings = array("d")
+
+    def start(self) -> None:
+        self.start_ns = time.perf_counter_ns()
+
+    def tick(self) -> None:
+        self.timings.append((time.perf_counter_ns() - self.start_ns) / 1e9)
+
+    def stats(self) -> StreamTimingStats:
+        if not self.timings:
+            return StreamTimingStats()
+        timings = np.frombuffer(self.timings, dtype=np.float64)
+        inter_chunk = np.diff(timings)
+        return StreamTimingStats(
+            ttft=float(timings[0]),
+            inter_chunk_p50=float(np.percentile(inter_chunk, 50)) if inter_chunk.size else 0.0,
+            inter_chunk_p95=float(np.percentile(inter_chunk, 95)) if inter_chunk.size else 0.0,
+            total_time=float(timings[-1]),
+            n_chunks=len(timings),
+        )
@@ -0,0 +1,36 @@
+from functools import lru_cache
+
+import numpy as np
+import tiktoken
+
+from prompting.base.dendrite import SynapseStreamResult
+
+# Chunk sizes are only compared against a threshold, so one fixed encoding is used for all models.
+CHUNK_ENCODING = "cl100k_base"
+TOKENIZER_THREADS = 8
+
+
+@lru_cache(maxsize=1)
+def get_chunk_encoding() -> tiktoken.Encoding:
+    return tiktoken.get_encoding(CHUNK_ENCODING)
+
+
+def count_tokens_per_chunk(stream_results: list[SynapseStreamResult]) -> None:
+    """Fill `tokens_per_chunk` of the stream results with the number of tokens in each of their chunks.
+
+    The chunks of all miners are tokenized in a single batched call and the counts are stored as int32 arrays.
+    Results which already have token counts are left untouched.
+    """
+    pending = [result for result in stream_results if result.tokens_per_chunk is None]
+    chunks = [chunk for result in pending for chunk in result.accumulated_chunks or []]
+    if chunks:
+        token_ids = get_chunk_encoding().encode_ordinary_batch(chunks, num_threads=TOKENIZER_THREADS)
+        counts = np.fromiter((len(ids) for ids in token_ids), dtype=np.int32, count=len(chunks))
+    else:
+        counts = np.zeros(0, dtype=np.int32)
+
+    offset = 0
+    for result in pending:
+        n_chunks = len(result.accumulated_chunks or [])
+        result.tokens_per_chunk = counts[offset : offset + n_chunks]
+        offset += n_chunks
@@ -0,0 +1,141 @@
+"""Concurrent scraping of the website content of many URLs, with a TTL cache of the extracted text.
+
+The pages are downloaded with one async httpx client, so the URLs given by all miners for a task are fetched at the
+same time instead of one blocking `trafilatura.fetch_url` after another. The text is extracted with trafilatura in a
+worker thread, and every URL is fetched at most once per `fetch_many` call. Websites which answered are not fetched
+again within the TTL, failed requests are retried by the next call.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+
+import httpx
+import trafilatura
+from loguru import logger
+
+from prompting.settings import settings
+
+MAX_CHARS = 5000
+# Pages larger than this are not downloaded in full, trafilatura's own limit.
+MAX_PAGE_BYTES = 20 * 1024**2
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire `ttl` seconds after they were stored."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, str | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: str) -> tuple[bool, str | None]:
+        """Return whether `key` has a live entry, and its value."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def put(self, key: str, value: str | None) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic(), value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class WebScraper:
+    def __init__(self, cache: TTLCache, concurrency: int, request_timeout: float):
+        self.cache = cache
+        self.concurrency = concurrency
+        self.request_timeout = request_timeout
+
+    @staticmethod
+    def extract(html: str) -> str | None:
+        extracted = trafilatura.extract(html)
+        return extracted[:MAX_CHARS] if extracted else None
+
+    async def _download(self, client: httpx.AsyncClient, url: str) -> str | None:
+        async with client.stream("GET", url) as response:
+            if response.status_code != 200:
+                # Raised instead of returning None so that the failure isn't cached, like the other request errors.
+                raise httpx.HTTPStatusError(
+                    f"status code {response.status_code}", request=response.request, response=response
+                )
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > MAX_PAGE_BYTES:
+                    logger.debug(f"Website {url} is larger than {MAX_PAGE_BYTES} bytes")
+                    return None
+            return body.decode(response.encoding or "utf-8", errors="replace")
+
+    async def _fetch(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, url: str) -> str | None:
+        async with semaphore:
+            try:
+                html = await self._download(client, url)
+                content = await asyncio.to_thread(self.extract, html) if html else None
+            except Exception as ex:
+                # Errors aren't cached, the website may be reachable for the next task.
+                logger.debug(f"Failed to fetch website {url}: {ex}")
+                return None
+        self.cache.put(url, content)
+        return content
+
+    async def afetch_many(
+        self, urls: Iterable[str], timeout: float, transport: httpx.AsyncBaseTransport | None = None
+    ) -> dict[str, str | None]:
+        """Return the extracted content of each distinct URL, or None if it couldn't be fetched within `timeout`."""
+        contents: dict[str, str | None] = {}
+        pending: list[str] = []
+        for url in dict.fromkeys(urls):
+            found, content = self.cache.lookup(url)
+            if found:
+                contents[url] = content
+            else:
+                pending.append(url)
+        if not pending:
+            return contents
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with httpx.AsyncClient(
+            timeout=self.request_timeout,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            transport=transport,
+        ) as client:
+            tasks = {url: asyncio.create_task(self._fetch(client, semaphore, url)) for url in pending}
+            _, not_done = await asyncio.wait(tasks.values(), timeout=timeout)
+            for task in not_done:
+                task.cancel()
+            if not_done:
+                logger.debug(f"{len(not_done)} of {len(pending)} websites were not fetched within {timeout}s")
+                await asyncio.gather(*not_done, return_exceptions=True)
+        for url, task in tasks.items():
+            contents[url] = None if task.cancelled() or task.exception() else task.result()
+        return contents
+
+    def fetch_many(self, urls: Iterable[str], timeout: float | None = None) -> dict[str, str | None]:
+        """Blocking version of `afetch_many`, for threads which don't run an event loop, such as the scorer's."""
+        timeout = settings.WEB_SCRAPE_TIMEOUT if timeout is None else timeout
+        return asyncio.run(self.afetch_many(urls, timeout))
+
+
+web_scraper = WebScraper(
+    cache=TTLCache(max_size=settings.WEB_SCRAPE_CACHE_SIZE, ttl=settings.WEB_SCRAPE_CACHE_TTL),
+    concurrency=settings.WEB_SCRAPE_CONCURRENCY,
+    request_timeout=settings.WEB_SCRAPE_REQUEST_TIMEOUT,
+)
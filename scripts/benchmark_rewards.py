@@ -0,0 +1,387 @@
+"""Micro-benchmarks of the reward models and of the reward configs of the tasks.
+
+Every reward model in `prompting/rewards/` is run through `BaseRewardModel.apply`, and every `*RewardConfig` found in
+`prompting/tasks/` through `BaseRewardConfig.apply`, on synthetic `DendriteResponseEvent`s of 10, 100 and 1000
+completions. The completion lengths follow a log-normal distribution, and some completions are empty or duplicated as
+with real miners. For each model and size the throughput, p50/p99 latency of `apply` and the peak memory allocated by
+the validator process (measured with tracemalloc in a separate pass) are written to a JSON file, which `--compare`
+diffs against the results of another commit.
+
+The benchmark runs on CPU: the embedding model is replaced by a feature hashing stand-in and the websites of the web
+retrieval task are served from the scraper's cache, so nothing is downloaded.
+
+    python scripts/benchmark_rewards.py --output before.json
+    python scripts/benchmark_rewards.py --output after.json --compare before.json
+"""
+
+import argparse
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import zlib
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+os.environ.setdefault("NEURON_DEVICE", "cpu")
+
+import numpy as np  # noqa: E402
+
+from prompting import settings  # noqa: E402
+
+settings.settings = settings.Settings(mode="mock")
+
+from prompting.base.dendrite import DendriteResponseEvent, SynapseStreamResult  # noqa: E402
+from prompting.datasets.utils import ENGLISH_WORDS  # noqa: E402
+
+SIZES = (10, 100, 1000)
+EMBEDDING_DIM = 384
+# Words in a completion, log-normal around a median of 120 words.
+MEDIAN_WORDS = 120
+WORDS_SIGMA = 0.9
+MAX_WORDS = 2000
+EMPTY_RATE = 0.05
+DUPLICATE_RATE = 0.1
+ZIPF_EXPONENT = 1.2
+WORDS_PER_CHUNK = 4
+N_WEBSITES = 50
+
+
+class HashingEmbedder:
+    """CPU stand-in for the embedding model: bag of words hashed into `dim` buckets."""
+
+    def __init__(self, dim: int = EMBEDDING_DIM, max_length: int = 512):
+        self.dim = dim
+        self.max_length = max_length
+
+    def encode(self, inputs: str | list[str], to_numpy: bool = True, max_length: int | None = None) -> np.ndarray:
+        texts = [inputs] if isinstance(inputs, str) else inputs
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = text.lower().split()[: max_length or self.max_length]
+            buckets = [zlib.crc32(word.encode()) % self.dim for word in words]
+            embeddings[row] = np.bincount(buckets, minlength=self.dim)
+        return embeddings
+
+
+def install_embedding_stand_in() -> None:
+    """Share a `HashingEmbedder` between the embedding based reward models instead of loading the embedding model."""
+    from prompting.rewards.registry import reward_registry
+
+    reward_registry.set_embedding_model(HashingEmbedder(), model_name=f"hashing-{EMBEDDING_DIM}")
+
+
+class Payloads:
+    """Synthetic references and completions for each kind of task."""
+
+    def __init__(self, rng: np.random.Generator):
+        self.rng = rng
+        self.websites = [f"https://www.example{i}.com/article" for i in range(N_WEBSITES)]
+        self.pages = {url: self.text(400) for url in self.websites}
+
+    def words(self, n: int) -> list[str]:
+        # ENGLISH_WORDS is sorted by frequency, word ranks follow Zipf's law as in natural text.
+        ranks = np.minimum(self.rng.zipf(ZIPF_EXPONENT, n) - 1, len(ENGLISH_WORDS) - 1)
+        return [ENGLISH_WORDS[rank] for rank in ranks]
+
+    def text(self, n_words: int) -> str:
+        words = self.words(n_words)
+        sentences, start = [], 0
+        while start < len(words):
+            length = int(self.rng.integers(8, 25))
+            sentences.append(" ".join(words[start : start + length]).capitalize() + ".")
+            start += length
+        return " ".join(sentences)
+
+    def length(self) -> int:
+        return int(min(max(self.rng.lognormal(np.log(MEDIAN_WORDS), WORDS_SIGMA), 1), MAX_WORDS))
+
+    def date(self) -> str:
+        year, month, day = (int(self.rng.integers(low, high)) for low, high in ((1700, 2024), (1, 13), (1, 29)))
+        formats = [f"{month}/{day}/{year}", f"March {day}, {year}", f"{day} December {year}", str(year)]
+        return formats[int(self.rng.integers(len(formats)))]
+
+    def completion(self, kind: str) -> str:
+        if kind == "date":
+            return f"{self.text(self.length() // 4)} It happened on {self.date()}. {self.text(10)}"
+        if kind == "number":
+            number = round(float(self.rng.normal(42, 10)), 2)
+            return f"{self.text(self.length() // 4)} The answer is {number}."
+        if kind == "multi_choice":
+            if self.rng.random() < 0.5:
+                return f"The answer is {'ABCD'[int(self.rng.integers(4))]}."
+            probabilities = self.rng.dirichlet(np.ones(4))
+            return json.dumps({choice: round(float(p), 3) for choice, p in zip("ABCD", probabilities)})
+        if kind == "web":
+            url = self.websites[int(self.rng.integers(N_WEBSITES))]
+            page = self.pages[url]
+            cut = int(self.rng.integers(len(page) // 2, len(page)))
+            return json.dumps({"url": url, "content": page[:cut], "relevant": page[: cut // 4]})
+        return self.text(self.length())
+
+    def reference(self, kind: str) -> str:
+        if kind == "date":
+            return f"It happened on {self.date()}."
+        if kind == "number":
+            return "42.0"
+        if kind == "multi_choice":
+            return "B"
+        if kind == "web":
+            from prompting.datasets.random_website import DDGDatasetEntry
+
+            url = self.websites[0]
+            search_term = " ".join(self.words(5))
+            entry = DDGDatasetEntry(search_term=search_term, website_url=url, website_content=self.pages[url])
+            return json.dumps(entry.model_dump_json())
+        return self.text(MEDIAN_WORDS)
+
+    def response_event(self, kind: str, n: int) -> DendriteResponseEvent:
+        completions: list[str] = []
+        for _ in range(n):
+            draw = self.rng.random()
+            if draw < EMPTY_RATE:
+                completions.append("")
+            elif draw < EMPTY_RATE + DUPLICATE_RATE and completions:
+                completions.append(completions[int(self.rng.integers(len(completions)))])
+            else:
+                completions.append(self.completion(kind))
+        stream_results = []
+        for uid, completion in enumerate(completions):
+            # Chunks keep their trailing space, so that joining them gives back the completion.
+            words = completion.split(" ") if completion else []
+            chunks = [
+                " ".join(words[i : i + WORDS_PER_CHUNK]) + (" " if i + WORDS_PER_CHUNK < len(words) else "")
+                for i in range(0, len(words), WORDS_PER_CHUNK)
+            ]
+            stream_results.append(
+                SynapseStreamResult(
+                    uid=uid,
+                    accumulated_chunks=chunks,
+                    accumulated_chunks_timings=list(np.cumsum(self.rng.exponential(0.02, len(chunks)))),
+                    tokens_per_chunk=[len(chunk.split()) for chunk in chunks],
+                )
+            )
+        return DendriteResponseEvent(
+            uids=list(range(n)), timeout=settings.settings.NEURON_TIMEOUT, stream_results=stream_results
+        )
+
+
+def payload_kind(models: list[Any]) -> str:
+    """The kind of completions the reward models score, the most specific one if they score several."""
+    names = {type(model).__name__ for model in models}
+    for name, kind in (
+        ("WebRetrievalRewardModel", "web"),
+        ("MultiChoiceRewardModel", "multi_choice"),
+        ("DateRewardModel", "date"),
+        ("FloatDiffModel", "number"),
+    ):
+        if name in names:
+            return kind
+    return "text"
+
+
+def reward_models() -> dict[str, Any]:
+    from prompting.rewards.date import DateRewardModel
+    from prompting.rewards.exact_match import ExactMatchRewardModel
+    from prompting.rewards.float_diff import FloatDiffModel
+    from prompting.rewards.inference_reward_model import InferenceRewardModel
+    from prompting.rewards.multi_choice import MultiChoiceRewardModel
+    from prompting.rewards.penalty import PenaltyModel
+    from prompting.rewards.relevance import RelevanceRewardModel
+    from prompting.rewards.rouge import RougeRewardModel
+    from prompting.rewards.streaming import StreamingRewardModel
+    from prompting.rewards.web_retrieval import WebRetrievalRewardModel
+
+    models = [
+        DateRewardModel(),
+        ExactMatchRewardModel(),
+        FloatDiffModel(),
+        InferenceRewardModel(),
+        MultiChoiceRewardModel(),
+        PenaltyModel(),
+        RelevanceRewardModel(),
+        RougeRewardModel(),
+        StreamingRewardModel(max_tokens_per_chunk=WORDS_PER_CHUNK),
+        WebRetrievalRewardModel(),
+    ]
+    return {type(model).__name__: model for model in models}
+
+
+def reward_configs() -> tuple[dict[str, Any], dict[str, str]]:
+    """Every `BaseRewardConfig` subclass defined in `prompting.tasks`, and the modules which failed to import."""
+    import prompting.tasks
+    from prompting.rewards.reward import BaseRewardConfig
+
+    configs: dict[str, Any] = {}
+    skipped: dict[str, str] = {}
+    for module_info in pkgutil.iter_modules(prompting.tasks.__path__):
+        module_name = f"prompting.tasks.{module_info.name}"
+        try:
+            module = importlib.import_module(module_name)
+        except Exception as ex:
+            skipped[module_name] = repr(ex)
+            continue
+        for name, obj in inspect.getmembers(module, inspect.isclass):
+            if issubclass(obj, BaseRewardConfig) and obj is not BaseRewardConfig and obj.__module__ == module_name:
+                configs[name] = obj
+    return configs, skipped
+
+
+@dataclass
+class Result:
+    name: str
+    kind: str
+    completions: int
+    runs: int
+    throughput: float
+    p50_ms: float
+    p99_ms: float
+    peak_memory_bytes: int
+
+
+def measure(
+    name: str,
+    kind: str,
+    payload: str,
+    size: int,
+    runs: int,
+    apply: Callable[[DendriteResponseEvent, str], Any],
+    payloads: Payloads,
+) -> Result:
+    # A warmup run starts the executors, then every run scores a new event, as the caches would hit otherwise.
+    apply(payloads.response_event(payload, size), payloads.reference(payload))
+    latencies = []
+    for _ in range(runs):
+        event, reference = payloads.response_event(payload, size), payloads.reference(payload)
+        t0 = time.perf_counter()
+        apply(event, reference)
+        latencies.append(time.perf_counter() - t0)
+
+    # Tracing slows allocations down, so memory is measured in a separate run. The reward process pool is not traced.
+    event, reference = payloads.response_event(payload, size), payloads.reference(payload)
+    tracemalloc.start()
+    apply(event, reference)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return Result(
+        name=name,
+        kind=kind,
+        completions=size,
+        runs=runs,
+        throughput=size * runs / sum(latencies),
+        p50_ms=float(np.percentile(latencies, 50) * 1000),
+        p99_ms=float(np.percentile(latencies, 99) * 1000),
+        peak_memory_bytes=peak,
+    )
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list[dict], baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = {(r["name"], r["completions"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path} (p50 latency and throughput, new / old):")
+    for result in results:
+        if (old := baseline.get((result["name"], result["completions"]))) is None:
+            continue
+        print(
+            f"{result['name']:>32} n={result['completions']:<5} "
+            f"p50 x{result['p50_ms'] / old['p50_ms']:.2f}  throughput x{result['throughput'] / old['throughput']:.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="Completions per response event.")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs per model and size.")
+    parser.add_argument("--filter", default="", help="Only benchmark models and configs whose name contains this.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="reward_benchmark.json", help="Where the JSON results are written.")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare with.")
+    args = parser.parse_args()
+
+    install_embedding_stand_in()
+    from prompting.tasks.base_task import BaseTextTask
+    from prompting.utils.web_scraper import web_scraper
+
+    payloads = Payloads(np.random.default_rng(args.seed))
+    for url, page in payloads.pages.items():
+        web_scraper.cache.put(url, page)
+    task = BaseTextTask()
+
+    benchmarks: list[tuple[str, str, str, Callable]] = []
+    for name, model in reward_models().items():
+        benchmarks.append(
+            (
+                name,
+                "model",
+                payload_kind([model]),
+                lambda event, reference, model=model: model.apply(
+                    response_event=event, reference=reference, challenge=reference, task=task
+                ),
+            )
+        )
+    configs, skipped = reward_configs()
+    for name, config in configs.items():
+        benchmarks.append(
+            (
+                name,
+                "config",
+                payload_kind(config.reward_definitions),
+                lambda event, reference, config=config: config.apply(
+                    response_event=event, reference=reference, challenge=reference, task=task
+                ),
+            )
+        )
+    for module_name, error in skipped.items():
+        print(f"Skipped {module_name}, it failed to import: {error}", file=sys.stderr)
+
+    results = []
+    for name, kind, payload, apply in benchmarks:
+        if args.filter not in name:
+            continue
+        for size in args.sizes:
+            result = measure(name, kind, payload, size, args.runs, apply, payloads)
+            results.append(asdict(result))
+            print(
+                f"{name:>32} n={size:<5} {result.throughput:10.1f} completions/s  p50 {result.p50_ms:9.2f} ms  "
+                f"p99 {result.p99_ms:9.2f} ms  peak {result.peak_memory_bytes / 1024**2:8.2f} MiB"
+            )
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            "REWARD_PROCESSES": settings.settings.REWARD_PROCESSES,
+            "REWARD_DISPATCH_THREADS": settings.settings.REWARD_DISPATCH_THREADS,
+            "EMBEDDING_BATCH_SIZE": settings.settings.EMBEDDING_BATCH_SIZE,
+        },
+        "embedding_model": f"{HashingEmbedder.__name__}(dim={EMBEDDING_DIM})",
+        "skipped": skipped,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
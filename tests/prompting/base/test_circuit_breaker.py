@@ -0,0 +1,57 @@
+# ruff: noqa: E402
+from unittest.mock import patch
+
+from prompting import settings
+
+settings.settings = settings.Settings.load(mode="mock")
+from prompting.base.circuit_breaker import CircuitBreakerRegistry, CircuitState
+from prompting.base.dendrite import SynapseStreamResult
+from prompting.settings import settings
+
+
+def _fail(registry: CircuitBreakerRegistry, uid: int, times: int):
+    for _ in range(times):
+        registry.record_result(
+            SynapseStreamResult(uid=uid, exception="Connection refused", status_code=500), unreachable=True
+        )
+
+
+def test_circuit_opens_after_threshold():
+    registry = CircuitBreakerRegistry()
+    _fail(registry, uid=1, times=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD - 1)
+    assert registry.is_closed(1)
+    _fail(registry, uid=1, times=1)
+    assert registry.state(1) == CircuitState.OPEN
+
+
+def test_half_open_probe():
+    registry = CircuitBreakerRegistry()
+    with patch("prompting.base.circuit_breaker.time.monotonic", return_value=0):
+        _fail(registry, uid=1, times=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD)
+
+    with patch("prompting.base.circuit_breaker.time.monotonic", return_value=settings.CIRCUIT_BREAKER_BACKOFF):
+        assert registry.half_open_uids() == [1]
+        # A failed probe opens the circuit again with twice the backoff.
+        registry.record_failure(1)
+        assert registry.circuits[1].open_until == 3 * settings.CIRCUIT_BREAKER_BACKOFF
+
+    with patch("prompting.base.circuit_breaker.time.monotonic", return_value=3 * settings.CIRCUIT_BREAKER_BACKOFF):
+        assert registry.state(1) == CircuitState.HALF_OPEN
+        registry.record_success(1)
+        assert registry.is_closed(1)
+
+
+def test_partial_stream_is_not_a_failure():
+    registry = CircuitBreakerRegistry()
+    for _ in range(settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        registry.record_result(
+            SynapseStreamResult(uid=1, accumulated_chunks=["a"], exception="timeout", status_code=500), unreachable=True
+        )
+    assert registry.is_closed(1)
+
+
+def test_miner_which_answered_is_not_a_failure():
+    registry = CircuitBreakerRegistry()
+    for _ in range(settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        registry.record_result(SynapseStreamResult(uid=1, exception="ReadTimeout", status_code=500), unreachable=False)
+    assert registry.is_closed(1)
@@ -0,0 +1,112 @@
+# ruff: noqa: E402
+import asyncio
+from types import SimpleNamespace
+
+from prompting import settings
+
+settings.settings = settings.Settings.load(mode="mock")
+from prompting.base.client_pool import AxonClient, AxonClientPool
+
+
+class FakeHttpClient:
+    def __init__(self):
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakePool(AxonClientPool):
+    """Pool building clients without a wallet to sign with."""
+
+    def _build(self, key, loop) -> AxonClient:
+        return AxonClient(key=key, http_client=FakeHttpClient(), loop=loop)
+
+
+def _axon(ip: str = "1.2.3.4", port: int = 8091, hotkey: str = "hotkey") -> SimpleNamespace:
+    return SimpleNamespace(ip=ip, port=port, hotkey=hotkey)
+
+
+def test_client_is_reused_per_axon():
+    async def run():
+        pool = FakePool()
+        client = pool.get(_axon())
+        assert pool.get(_axon()) is client
+        assert pool.get(_axon(port=8092)) is not client
+        assert len(pool) == 2
+        assert client.base_url == "http://1.2.3.4:8091"
+
+    asyncio.run(run())
+
+
+def test_invalidated_client_is_rebuilt_and_closed():
+    async def run():
+        pool = FakePool()
+        previous_axon = _axon()
+        client = pool.get(previous_axon)
+
+        # The metagraph resync invalidates the previous info of every axon which changed.
+        pool.invalidate(previous_axon)
+        assert len(pool) == 0
+        rebuilt = pool.get(_axon())
+        assert rebuilt is not client
+
+        await pool.evict_idle()
+        assert client.http_client.closed
+        assert not rebuilt.http_client.closed
+
+    asyncio.run(run())
+
+
+def test_new_hotkey_gets_its_own_client():
+    async def run():
+        pool = FakePool()
+        client = pool.get(_axon(hotkey="old"))
+        pool.invalidate(_axon(hotkey="old"))
+        assert pool.get(_axon(hotkey="new")).key == ("1.2.3.4", 8091, "new")
+        await pool.evict_idle()
+        assert client.http_client.closed
+
+    asyncio.run(run())
+
+
+def test_evict_idle_closes_only_idle_clients():
+    async def run():
+        pool = FakePool()
+        idle = pool.get(_axon(port=1))
+        active = pool.get(_axon(port=2))
+        idle.last_used -= settings.settings.AXON_CLIENT_IDLE_TIMEOUT + 1
+        pool._last_eviction -= settings.settings.AXON_CLIENT_IDLE_TIMEOUT + 1
+
+        await pool.evict_idle()
+        assert idle.http_client.closed
+        assert not active.http_client.closed
+        assert len(pool) == 1
+        assert pool.get(_axon(port=2)) is active
+
+    asyncio.run(run())
+
+
+def test_evict_idle_is_rate_limited():
+    async def run():
+        pool = FakePool()
+        idle = pool.get(_axon())
+        idle.last_used -= settings.settings.AXON_CLIENT_IDLE_TIMEOUT + 1
+
+        # Eviction scans at most once per idle timeout unless clients were invalidated.
+        await pool.evict_idle()
+        assert not idle.http_client.closed
+        assert len(pool) == 1
+
+    asyncio.run(run())
+
+
+def test_aclose_closes_every_client():
+    async def run():
+        pool = FakePool()
+        clients = [pool.get(_axon(port=port)) for port in range(3)]
+        await pool.aclose()
+        assert len(pool) == 0
+        assert all(client.http_client.closed for client in clients)
+
+    asyncio.run(run())
@@ -0,0 +1,53 @@
+import numpy as np
+
+from prompting.base.dendrite import DendriteResponseEvent, SynapseStreamResult
+
+TIMEOUT = 15
+
+
+def _response_event() -> DendriteResponseEvent:
+    stream_results = [
+        SynapseStreamResult(uid=1, accumulated_chunks=["Hello", " world"], accumulated_chunks_timings=[0.5, 1.5]),
+        SynapseStreamResult(uid=2, accumulated_chunks=[], accumulated_chunks_timings=[]),
+        SynapseStreamResult(uid=3, accumulated_chunks=["late"], accumulated_chunks_timings=[20.0], status_code=408),
+        SynapseStreamResult(uid=4, exception="Connection refused", status_code=502),
+        SynapseStreamResult(uid=5, accumulated_chunks=["ünïcode"], accumulated_chunks_timings=[0.1]),
+    ]
+    return DendriteResponseEvent(uids=[1, 2, 3, 4, 5], timeout=TIMEOUT, stream_results=stream_results)
+
+
+def test_columns():
+    response_event = _response_event()
+    assert response_event.completions == ["Hello world", "", "late", "", "ünïcode"]
+    assert response_event.status_codes.tolist() == [200, 204, 408, 502, 200]
+    assert np.allclose(response_event.timings, [1.5, 0, TIMEOUT, 0, 0.1])
+    assert response_event.stream_results_uids.tolist() == [1, 2, 3, 4, 5]
+    assert response_event.stream_results_exceptions[3] == "Connection refused"
+
+
+def test_chunks_are_not_copied():
+    response_event = _response_event()
+    assert response_event.stream_results_all_chunks[0] is response_event.stream_results[0].accumulated_chunks
+    assert response_event.stream_results_all_tokens_per_chunk[0] == []
+
+
+def test_model_dump_keeps_attribute_names():
+    dumped = _response_event().model_dump()
+    for key in ["completions", "status_codes", "timings", "stream_results_all_chunks_timings"]:
+        assert key in dumped
+
+
+def test_tokens_per_chunk_arrays():
+    stream_results = [
+        SynapseStreamResult(uid=1, accumulated_chunks=["a", "b"], tokens_per_chunk=np.array([1, 3], dtype=np.int32)),
+        SynapseStreamResult(uid=2, accumulated_chunks=[]),
+    ]
+    response_event = DendriteResponseEvent(uids=[1, 2], timeout=TIMEOUT, stream_results=stream_results)
+    tokens_per_chunk = response_event.stream_results_all_tokens_per_chunk
+    assert tokens_per_chunk[0].tolist() == [1, 3]
+    assert list(tokens_per_chunk[1]) == []
+
+
+def test_completions_are_built_once():
+    response_event = _response_event()
+    assert response_event.completions is response_event.completions
@@ -0,0 +1,268 @@
+# ruff: noqa: E402
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+from substrateinterface import Keypair
+
+from prompting import settings
+
+settings.settings = settings.Settings.load(mode="mock")
+from prompting.base.circuit_breaker import CircuitBreakerRegistry
+from prompting.base.client_pool import AxonClient, axon_client_pool
+from prompting.base.dendrite import SynapseStreamResult
+from prompting.base.epistula import (
+    MinerQuery,
+    SignatureCache,
+    generate_header,
+    handle_inference,
+    query_miners_quorum,
+    signature_cache,
+    verify_signature,
+)
+from prompting.base.io_scheduler import OutboundScheduler, TrafficClass
+from prompting.base.latency import MinerTimeouts, miner_latencies
+
+SENDER = Keypair.create_from_uri("//Alice")
+RECEIVER = Keypair.create_from_uri("//Bob")
+BODY = json.dumps({"task": "QuestionAnsweringTask", "model": "model", "messages": []}).encode("utf-8")
+
+
+def test_generate_header_is_verifiable():
+    headers = generate_header(SENDER, BODY, RECEIVER.ss58_address)
+    error = verify_signature(
+        headers["Epistula-Request-Signature"],
+        BODY,
+        headers["Epistula-Timestamp"],
+        headers["Epistula-Uuid"],
+        RECEIVER.ss58_address,
+        SENDER.ss58_address,
+        round(time.time() * 1000),
+    )
+    assert error is None
+    assert headers["task"] == "QuestionAnsweringTask"
+
+
+def test_secret_signatures_are_cached_per_interval():
+    cache = SignatureCache()
+    first = cache.secret_signatures(SENDER, RECEIVER.ss58_address, 1e4)
+    assert cache.secret_signatures(SENDER, RECEIVER.ss58_address, 1e4) is first
+    assert SENDER.verify(str(1e4 - 1) + "." + RECEIVER.ss58_address, first[0])
+    assert SENDER.verify(str(1e4 + 1) + "." + RECEIVER.ss58_address, first[2])
+
+    # Windows older than the previous interval are dropped.
+    cache.secret_signatures(SENDER, RECEIVER.ss58_address, 3e4)
+    assert (SENDER.ss58_address, RECEIVER.ss58_address, 1e4) not in cache._secret_signatures
+
+
+def test_body_digest_is_shared():
+    digest, fields = signature_cache.body(BODY)
+    assert signature_cache.body(BODY)[0] == digest
+    assert fields["model"] == "model"
+
+
+def test_cache_is_shared_by_signing_threads():
+    cache = SignatureCache(max_bodies=4)
+    bodies = [json.dumps({"i": i}).encode("utf-8") for i in range(64)]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        digests = list(executor.map(lambda body: cache.body(body)[0], bodies * 4))
+        list(executor.map(lambda i: cache.secret_signatures(SENDER, RECEIVER.ss58_address, i * 1e4), range(64)))
+    assert len(cache._bodies) == 4
+    assert digests[:64] == digests[64:128]
+    assert (SENDER.ss58_address, RECEIVER.ss58_address, 63e4) in cache._secret_signatures
+
+
+async def _respond(uid: int, delay: float) -> SynapseStreamResult:
+    await asyncio.sleep(delay)
+    return SynapseStreamResult(uid=uid, accumulated_chunks=[str(uid)])
+
+
+def _start(delays: dict[int, float]) -> list[asyncio.Task]:
+    return [asyncio.create_task(_respond(uid, delay)) for uid, delay in delays.items()]
+
+
+def test_quorum_returns_fastest_results_in_uid_order():
+    async def run():
+        # uid 3 answers first, uid 1 is the straggler.
+        query = MinerQuery(uids=[1, 2, 3], tasks=_start({1: 0.5, 2: 0.02, 3: 0.01}))
+        results = await query.wait_for_quorum(quorum=0.6)
+        assert [result.uid for result in results] == [2, 3]
+        assert len(query.pending) == 1
+
+        assert [result.uid async for result in query.stragglers()] == [1]
+        assert [result.uid for result in await query.results()] == [1, 2, 3]
+
+    asyncio.run(run())
+
+
+def test_quorum_deadline_leaves_stragglers_running():
+    async def run():
+        query = MinerQuery(uids=[1, 2], tasks=_start({1: 0.01, 2: 0.3}))
+        results = await query.wait_for_quorum(quorum=1.0, deadline=0.1)
+        assert [result.uid for result in results] == [1]
+        # The deadline only stops waiting, the straggler's stream isn't cancelled.
+        assert not query.tasks[1].cancelled()
+        assert [result.uid for result in await query.results()] == [1, 2]
+
+    asyncio.run(run())
+
+
+def test_cancelling_the_wait_does_not_cancel_the_miners():
+    async def run():
+        query = MinerQuery(uids=[1, 2], tasks=_start({1: 0.2, 2: 0.2}))
+        waiter = asyncio.create_task(query.wait_for_quorum())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert waiter.cancelled()
+        assert [result.uid for result in await query.results()] == [1, 2]
+
+    asyncio.run(run())
+
+
+def test_cancelled_miner_is_not_completed():
+    async def run():
+        query = MinerQuery(uids=[1, 2], tasks=_start({1: 0.01, 2: 1.0}))
+        query.tasks[1].cancel()
+        results = await query.wait_for_quorum()
+        assert [result.uid for result in results] == [1]
+        assert not query.pending
+
+    asyncio.run(run())
+
+
+def test_failures_do_not_count_towards_quorum():
+    async def fail(uid: int) -> SynapseStreamResult:
+        return SynapseStreamResult(uid=uid, exception="Connection refused", status_code=500)
+
+    async def run():
+        tasks = [asyncio.create_task(fail(1)), *_start({2: 0.05, 3: 0.3})]
+        query = MinerQuery(uids=[1, 2, 3], tasks=tasks)
+        results = await query.wait_for_quorum(quorum=0.3)
+        # The failed miner answered first, but the quorum waits for a successful completion.
+        assert [result.uid for result in results] == [1, 2]
+        assert query.succeeded == 1
+
+        # Only the miners which were still streaming are collected by the tail.
+        assert [result.uid for result in await query.tail()] == [3]
+        assert await query.tail() == []
+
+    asyncio.run(run())
+
+
+def test_query_miners_quorum():
+    async def start_queries(uids, body):
+        return _start({uid: 0.01 * (len(uids) - i) for i, uid in enumerate(uids)})
+
+    async def run():
+        with patch("prompting.base.epistula.start_queries", start_queries):
+            results, query = await query_miners_quorum([4, 5, 6, 7], b"{}", quorum=0.5)
+        assert [result.uid for result in results] == [6, 7]
+        assert query.uids == [4, 5, 6, 7]
+        assert [result.uid for result in await query.results()] == [4, 5, 6, 7]
+
+    asyncio.run(run())
+
+
+def test_query_miners_quorum_failure():
+    async def start_queries(uids, body):
+        raise RuntimeError("no wallet")
+
+    async def run():
+        with patch("prompting.base.epistula.start_queries", start_queries):
+            assert await query_miners_quorum([1], b"{}") == ([], None)
+
+    asyncio.run(run())
+
+
+def _sse(content: str) -> bytes:
+    return f"data: {json.dumps({'choices': [{'delta': {'content': content}}]})}\n\n".encode()
+
+
+def _client(chunk_delays: list[float]) -> AxonClient:
+    async def stream():
+        for i, delay in enumerate(chunk_delays):
+            await asyncio.sleep(delay)
+            yield _sse(str(i))
+        yield b"data: [DONE]\n\n"
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=stream()))
+    return AxonClient(key=("1.2.3.4", 8091, "hotkey"), http_client=httpx.AsyncClient(transport=transport), loop=None)
+
+
+async def _inference(chunk_delays: list[float], timeouts: MinerTimeouts) -> SynapseStreamResult:
+    metagraph = SimpleNamespace(axons={0: None})
+    with patch.object(axon_client_pool, "get", return_value=_client(chunk_delays)), patch.object(
+        miner_latencies, "timeouts", return_value=timeouts
+    ):
+        return await handle_inference(metagraph, None, b"{}", uid=0)
+
+
+def test_pause_between_chunks_is_not_a_first_byte_timeout():
+    timeouts = MinerTimeouts(connect=1, first_byte=0.1, read=1, total=2)
+    result = asyncio.run(_inference([0.01, 0.3, 0.01], timeouts))
+    assert result.status_code == 200
+    assert result.accumulated_chunks == ["0", "1", "2"]
+
+
+def test_inference_waits_for_a_scheduler_slot():
+    scheduler = OutboundScheduler(
+        capacity=1, quotas={TrafficClass.ORGANIC: 1, TrafficClass.INFERENCE: 1, TrafficClass.AVAILABILITY: 1}
+    )
+    timeouts = MinerTimeouts(connect=1, first_byte=1, read=1, total=2)
+    metagraph = SimpleNamespace(axons={0: None, 1: None})
+
+    async def run():
+        return await asyncio.gather(*[handle_inference(metagraph, None, b"{}", uid=uid) for uid in (0, 1)])
+
+    with patch("prompting.base.epistula.outbound_scheduler", scheduler), patch.object(
+        axon_client_pool, "get", side_effect=lambda axon: _client([0.1])
+    ), patch.object(miner_latencies, "timeouts", return_value=timeouts):
+        results = asyncio.run(run())
+    assert [result.status_code for result in results] == [200, 200]
+    assert scheduler.completed[TrafficClass.INFERENCE] == 2
+    # The second request queued for the slot while the first one streamed.
+    assert scheduler.metrics()["inference_avg_wait_time"] > 0.04
+
+
+def test_slow_first_chunk_times_out():
+    timeouts = MinerTimeouts(connect=1, first_byte=0.1, read=1, total=2)
+    result = asyncio.run(_inference([0.3, 0.01], timeouts))
+    # Timeouts and transport errors are reported as 500, like any other failed request.
+    assert result.status_code == 500
+    assert result.status_message.startswith("Stream timed out")
+    assert result.accumulated_chunks == []
+
+
+def test_transport_error_is_reported_as_500():
+    def refuse(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("Connection refused", request=request)
+
+    client = AxonClient(
+        key=("1.2.3.4", 8091, "hotkey"), http_client=httpx.AsyncClient(transport=httpx.MockTransport(refuse)), loop=None
+    )
+    registry = CircuitBreakerRegistry()
+    with patch.object(axon_client_pool, "get", return_value=client), patch(
+        "prompting.base.epistula.circuit_breakers", registry
+    ):
+        for _ in range(settings.settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+            result = asyncio.run(handle_inference(SimpleNamespace(axons={0: None}), None, b"{}", uid=0))
+    assert result.status_code == 500
+    assert result.exception == "Connection refused"
+    # A miner which can't be connected to trips its breaker.
+    assert not registry.is_closed(0)
+
+
+def test_timeout_of_reachable_miner_does_not_trip_breaker():
+    registry = CircuitBreakerRegistry()
+    timeouts = MinerTimeouts(connect=1, first_byte=0.1, read=1, total=0.3)
+    with patch("prompting.base.epistula.circuit_breakers", registry):
+        for _ in range(settings.settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+            # The miner answers, then runs out of time after its first chunk or before it.
+            assert asyncio.run(_inference([0.01, 1.0], timeouts)).status_code == 500
+            assert asyncio.run(_inference([1.0], timeouts)).status_code == 500
+    assert registry.is_closed(0)
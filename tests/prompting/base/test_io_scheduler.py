@@ -0,0 +1,82 @@
+# ruff: noqa: E402
+import asyncio
+
+from prompting import settings
+
+settings.settings = settings.Settings.load(mode="mock")
+from prompting.base.io_scheduler import OutboundScheduler, TrafficClass
+
+QUOTAS = {TrafficClass.ORGANIC: 2, TrafficClass.INFERENCE: 2, TrafficClass.AVAILABILITY: 1}
+
+
+def test_quota_and_capacity_are_respected():
+    scheduler = OutboundScheduler(capacity=3, quotas=QUOTAS)
+    peak = {traffic_class: 0 for traffic_class in TrafficClass}
+    peak_total = 0
+
+    async def request(traffic_class: TrafficClass):
+        nonlocal peak_total
+        async with scheduler.slot(traffic_class):
+            peak[traffic_class] = max(peak[traffic_class], scheduler.active[traffic_class])
+            peak_total = max(peak_total, sum(scheduler.active.values()))
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(
+            *[request(TrafficClass.INFERENCE) for _ in range(5)],
+            *[request(TrafficClass.AVAILABILITY) for _ in range(5)],
+        )
+
+    asyncio.run(run())
+    assert peak[TrafficClass.INFERENCE] == 2
+    assert peak[TrafficClass.AVAILABILITY] == 1
+    assert peak_total == 3
+    assert scheduler.metrics()["inference_queue_depth"] == 0
+
+
+def test_organic_is_served_first():
+    scheduler = OutboundScheduler(capacity=1, quotas=QUOTAS)
+    order = []
+
+    async def request(traffic_class: TrafficClass):
+        async with scheduler.slot(traffic_class):
+            order.append(traffic_class)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        blocker = asyncio.create_task(request(TrafficClass.INFERENCE))
+        await asyncio.sleep(0)
+        queued = [asyncio.create_task(request(TrafficClass.AVAILABILITY))]
+        queued.append(asyncio.create_task(request(TrafficClass.INFERENCE)))
+        queued.append(asyncio.create_task(request(TrafficClass.ORGANIC)))
+        await asyncio.gather(blocker, *queued)
+
+    asyncio.run(run())
+    assert order == [
+        TrafficClass.INFERENCE,
+        TrafficClass.ORGANIC,
+        TrafficClass.INFERENCE,
+        TrafficClass.AVAILABILITY,
+    ]
+
+
+def test_quota_bound_class_does_not_block_lower_classes():
+    scheduler = OutboundScheduler(
+        capacity=10, quotas={TrafficClass.ORGANIC: 1, TrafficClass.INFERENCE: 5, TrafficClass.AVAILABILITY: 5}
+    )
+
+    async def run():
+        await scheduler.acquire(TrafficClass.ORGANIC)
+        # The second organic request waits for the organic quota, with 9 slots still free.
+        organic = asyncio.create_task(scheduler.acquire(TrafficClass.ORGANIC))
+        await asyncio.sleep(0)
+        assert not organic.done()
+
+        await asyncio.wait_for(scheduler.acquire(TrafficClass.INFERENCE), timeout=1)
+        assert scheduler.active[TrafficClass.INFERENCE] == 1
+
+        scheduler.release(TrafficClass.ORGANIC)
+        await asyncio.wait_for(organic, timeout=1)
+        assert scheduler.active[TrafficClass.ORGANIC] == 1
+
+    asyncio.run(run())
@@ -0,0 +1,52 @@
+# ruff: noqa: E402
+import pytest
+
+from prompting import settings
+
+settings.settings = settings.Settings.load(mode="mock")
+from prompting.base.latency import COMPLETION_MARGIN, MIN_SAMPLES, MinerLatencyModel
+from prompting.settings import settings
+from prompting.utils.timer import StreamTimingStats
+
+
+def test_defaults_without_history():
+    timeouts = MinerLatencyModel().timeouts(uid=1)
+    assert timeouts.connect == settings.NEURON_CONNECT_TIMEOUT
+    assert timeouts.first_byte == settings.NEURON_FIRST_BYTE_TIMEOUT
+    assert timeouts.read == settings.NEURON_READ_TIMEOUT
+    assert timeouts.total == settings.NEURON_TIMEOUT
+
+
+def test_first_byte_timeout_follows_ttft():
+    model = MinerLatencyModel()
+    for _ in range(MIN_SAMPLES):
+        model.record(uid=1, timing_stats=StreamTimingStats(ttft=2.0, total_time=4.0, n_chunks=3), status_code=200)
+    assert model.stats(uid=1).ttft_p95 == pytest.approx(2.0)
+    assert model.timeouts(uid=1).first_byte == pytest.approx(4.0)
+    assert model.stats(uid=1).completion_p95 == pytest.approx(4.0)
+    assert model.timeouts(uid=1).total == pytest.approx(4.0 * COMPLETION_MARGIN)
+    # The later chunks are only bounded by the read timeout, within the total deadline.
+    assert model.timeouts(uid=1).read == min(settings.NEURON_READ_TIMEOUT, 4.0 * COMPLETION_MARGIN)
+
+
+def test_failing_miner_fails_fast():
+    model = MinerLatencyModel()
+    for _ in range(10):
+        model.record(uid=1, timing_stats=StreamTimingStats(), status_code=502)
+    assert model.timeouts(uid=1).connect == settings.NEURON_MIN_TIMEOUT
+
+    model.record(uid=1, timing_stats=StreamTimingStats(ttft=1.0, total_time=1.0, n_chunks=1), status_code=200)
+    assert model.timeouts(uid=1).connect == settings.NEURON_CONNECT_TIMEOUT
+
+
+def test_total_deadline_is_clamped():
+    model = MinerLatencyModel()
+    for _ in range(MIN_SAMPLES):
+        model.record(uid=1, timing_stats=StreamTimingStats(ttft=0.1, total_time=0.1, n_chunks=1), status_code=200)
+        model.record(uid=2, timing_stats=StreamTimingStats(ttft=1.0, total_time=60.0, n_chunks=9), status_code=200)
+    assert model.timeouts(uid=1).total == settings.NEURON_MIN_TIMEOUT
+    assert model.timeouts(uid=2).total == settings.NEURON_TIMEOUT
+
+    # A failure restores the full deadline until the miner succeeds again.
+    model.record(uid=1, timing_stats=StreamTimingStats(), status_code=500)
+    assert model.timeouts(uid=1).total == settings.NEURON_TIMEOUT
@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from prompting.base.sse import StreamError, iter_content, parse_content
+
+
+def _event(content: str | None) -> str:
+    delta = {} if content is None else {"content": content}
+    return json.dumps({"choices": [{"delta": delta, "index": 0, "finish_reason": None}]})
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (_event("Hello"), "Hello"),
+        (_event(""), None),
+        (_event(None), None),
+        (json.dumps({"choices": []}), None),
+        (json.dumps({"choices": [{"delta": None}]}), None),
+    ],
+)
+def test_parse_content(data, expected):
+    assert parse_content(data) == expected
+
+
+def test_parse_content_error_event():
+    with pytest.raises(StreamError):
+        parse_content(json.dumps({"error": {"message": "overloaded"}}))
+
+
+def test_iter_content_stops_at_done():
+    body = "".join(
+        [
+            ": keep-alive\n\n",
+            f"data: {_event('Hello')}\n\n",
+            f"data:{_event(' world')}\n\n",
+            f"data: {_event(None)}\n\n",
+            "data: [DONE]\n\n",
+            f"data: {_event('ignored')}\n\n",
+        ]
+    )
+    response = httpx.Response(200, content=body.encode("utf-8"))
+
+    async def collect():
+        return [content async for content in iter_content(response)]
+
+    assert asyncio.run(collect()) == ["Hello", " world"]
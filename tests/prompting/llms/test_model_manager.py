@@ -0,0 +1,41 @@
+# ruff: noqa: E402
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from prompting import settings
+
+settings.settings = settings.Settings(mode="mock")
+from prompting.llms.model_manager import AsyncModelScheduler, ModelManager
+from prompting.llms.model_zoo import ModelConfig
+from prompting.utils.scoring_queue import ScoringQueue
+
+MODEL_A = ModelConfig(llm_model_id="model-a", reward=0.1, min_ram=1)
+MODEL_B = ModelConfig(llm_model_id="model-b", reward=0.1, min_ram=1)
+
+
+def _selected_model(tasks: list[tuple[ModelConfig, float]]) -> ModelConfig:
+    """The model loaded by a scheduler step on a queue of (model, age in seconds) tasks, oldest first."""
+    queue = ScoringQueue()
+    now = time.monotonic()
+    for model, age in tasks:
+        queue.append(SimpleNamespace(task=SimpleNamespace(llm_model=model), created_at=now - age))
+    scheduler = AsyncModelScheduler(llm_model_manager=ModelManager(), sync=True)
+    with (
+        patch("prompting.llms.model_manager.scoring_queue", queue),
+        patch.object(ModelManager, "load_model") as load_model,
+    ):
+        asyncio.run(scheduler.run_step())
+    load_model.assert_called_once()
+    return load_model.call_args.args[0]
+
+
+def test_largest_backlog_is_loaded():
+    assert _selected_model([(MODEL_B, 10), (MODEL_A, 5), (MODEL_A, 1)]) == MODEL_A
+
+
+def test_model_of_a_starving_task_is_loaded():
+    max_age = settings.settings.SCORING_MAX_TASK_AGE
+    tasks = [(MODEL_B, max_age + 1)] + [(MODEL_A, 1)] * 20
+    assert _selected_model(tasks) == MODEL_B
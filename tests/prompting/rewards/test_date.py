@@ -0,0 +1,74 @@
+# ruff: noqa: E402
+from prompting import settings
+
+settings.settings = settings.Settings(mode="mock")
+import datetime
+
+import pytest
+
+from prompting.rewards.date import DateRewardModel
+from prompting.rewards.execution import CompletionsEvent
+from prompting.utils.dates import (
+    DATE_NOT_FOUND_CODE,
+    date_diff,
+    date_scores,
+    extract_date_and_sentence,
+    find_date,
+    parse_date,
+)
+
+
+@pytest.mark.parametrize(
+    "date, expected",
+    [
+        ("12/05/2020", datetime.date(2020, 12, 5)),
+        ("13/05/2020", datetime.date(2020, 5, 13)),
+        ("March 3rd, 1999", datetime.date(1999, 3, 3)),
+        ("Sep 1 1939", datetime.date(1939, 9, 1)),
+        ("5 December 2001", datetime.date(2001, 12, 5)),
+        ("1999", datetime.date(1999, 1, 1)),
+        ("February 30, 2020", None),
+        ("Mar 1 1500", None),
+    ],
+)
+def test_parse_date(date, expected):
+    assert parse_date(date) == expected
+
+
+def test_find_date_uses_first_sentence_with_a_date():
+    assert find_date("He was born abroad. On March 3, 1999 he left in 2001.") == "March 3, 1999"
+    assert find_date("No date here.") is None
+
+
+def test_extract_date_and_sentence():
+    assert extract_date_and_sentence("Intro. It ended in 1945. Later.") == ("1945", "It ended in <date>.")
+    assert extract_date_and_sentence("Intro. It was on May 4th here.") == ("May 4th", "It was on <date> here.")
+    assert extract_date_and_sentence("Nothing to see.") is None
+
+
+def test_date_diff():
+    assert date_diff("March 3, 1999", "3/5/1999") == 2
+    assert date_diff("1999", "12/05/2020") == 21 * 365
+    assert date_diff("March 3, 1999", None) == DATE_NOT_FOUND_CODE
+    assert date_diff("Mar 1 1500", "Mar 1 1500") == 0
+    assert date_diff("Mar 1 1500", "Mar 2 1500") == DATE_NOT_FOUND_CODE
+
+
+def test_date_scores():
+    scores = date_scores("It happened on March 3, 1999.", ["March 3, 1999", "3/13/1999", "", "no idea", "1850"])
+    assert scores[0] == pytest.approx(1.0)
+    assert scores[1] == pytest.approx(0.9048, abs=1e-4)
+    assert list(scores[2:]) == [0, 0, 0]
+
+
+def test_reference_without_date_scores_zero():
+    assert list(date_scores("No date here.", ["March 3, 1999"])) == [0]
+
+
+def test_reward_matches_date_score():
+    model = DateRewardModel()
+    completions = ["March 3, 1999", "It was 3/4/1999.", ""]
+    event = CompletionsEvent(completions=completions, uids=[0, 1, 2])
+    output = model.reward("March 3, 1999", event)
+    assert list(output.rewards) == [model.date_score("March 3, 1999", completion) for completion in completions]
+    assert len(output.timings) == len(completions)
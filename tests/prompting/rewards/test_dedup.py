@@ -0,0 +1,44 @@
+# ruff: noqa: E402
+from typing import ClassVar
+
+import numpy as np
+
+from prompting import settings
+
+settings.settings = settings.Settings(mode="mock")
+from prompting.base.dendrite import DendriteResponseEvent, SynapseStreamResult
+from prompting.rewards.reward import BaseRewardModel, BatchRewardOutput, CompletionDedup
+from prompting.tasks.base_task import BaseTextTask
+
+
+class LengthRewardModel(BaseRewardModel):
+    dedup_completions: ClassVar[bool] = True
+    scored: ClassVar[list[str]] = []
+
+    def reward(self, reference: str, response_event, **kwargs) -> BatchRewardOutput:
+        self.scored.extend(response_event.completions)
+        rewards = np.array([len(completion) for completion in response_event.completions], dtype=float)
+        return BatchRewardOutput(rewards=rewards, timings=rewards / 10)
+
+
+def _response_event(completions: list[str]) -> DendriteResponseEvent:
+    stream_results = [
+        SynapseStreamResult(uid=uid, accumulated_chunks=[completion]) for uid, completion in enumerate(completions)
+    ]
+    return DendriteResponseEvent(uids=list(range(len(completions))), timeout=10, stream_results=stream_results)
+
+
+def test_duplicates_are_scored_once():
+    response_event = _response_event(["aa", "b", "aa", "aa"])
+    dedup = CompletionDedup(response_event)
+    assert dedup.event.completions == ["aa", "b"]
+    assert dedup.event.uids == [0, 1]
+    assert dedup.ratio == 0.5
+
+    LengthRewardModel.scored.clear()
+    event = LengthRewardModel().apply(response_event=response_event, reference="", task=BaseTextTask(), dedup=dedup)
+    assert LengthRewardModel.scored == ["aa", "b"]
+    assert list(event.rewards) == [2, 1, 2, 2]
+    assert np.allclose(event.timings, [0.2, 0.1, 0.2, 0.2])
+    assert event.dedup_ratio == 0.5
+    assert event.asdict()[f"{event.reward_model_name}_reward_dedup_ratio"] == 0.5
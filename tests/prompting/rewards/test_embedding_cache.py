@@ -0,0 +1,44 @@
+# ruff: noqa: E402
+import numpy as np
+
+from prompting import settings
+
+settings.settings = settings.Settings(mode="mock")
+from prompting.rewards.embedding_cache import CachedEmbeddingModel, EmbeddingCache
+
+DIM = 4
+
+
+class FakeModel:
+    def __init__(self):
+        self.encoded: list[list[str]] = []
+
+    def encode(self, texts: list[str], to_numpy: bool = True, **kwargs) -> np.ndarray:
+        self.encoded.append(list(texts))
+        return np.array([[len(text)] * DIM for text in texts], dtype=np.float32)
+
+
+def _model(max_bytes: int = 1024) -> CachedEmbeddingModel:
+    return CachedEmbeddingModel(FakeModel(), model_name="fake", pooling_strategy="cls", cache=EmbeddingCache(max_bytes))
+
+
+def test_repeated_texts_are_embedded_once():
+    model = _model()
+    embeddings = model.encode(["aa", "b", "aa"])
+    assert embeddings.shape == (3, DIM)
+    assert embeddings[:, 0].tolist() == [2, 1, 2]
+    assert model.model.encoded == [["b", "aa"]]
+
+    assert model.encode("aa").shape == (1, DIM)
+    assert model.model.encoded == [["b", "aa"]]
+    assert model.cache.hits == 1
+    assert model.cache.misses == 3
+
+
+def test_eviction_respects_memory_budget():
+    model = _model(max_bytes=2 * DIM * 4)
+    model.encode(["a", "bb", "ccc"])
+    assert len(model.cache) == 2
+    assert model.cache.size_bytes <= model.cache.max_bytes
+    model.encode("a")
+    assert model.model.encoded[-1] == ["a"]
@@ -0,0 +1,57 @@
+# ruff: noqa: E402
+import numpy as np
+import pytest
+
+from prompting import settings
+
+settings.settings = settings.Settings.load(mode="mock")
+from prompting.base.dendrite import DendriteResponseEvent, SynapseStreamResult
+from prompting.rewards import execution
+from prompting.rewards.float_diff import FloatDiffModel
+from prompting.rewards.rouge import RougeRewardModel
+
+REFERENCE = "The answer to the question is 42, as computed by Deep Thought."
+COMPLETIONS = [
+    "The answer is 42, as computed by Deep Thought.",
+    "",
+    "It is 41.5",
+    "The answer to the question is 42, as computed by Deep Thought.",
+]
+
+
+@pytest.fixture(autouse=True)
+def process_pool():
+    yield
+    execution.reset_process_pool()
+
+
+def _response_event() -> DendriteResponseEvent:
+    stream_results = [
+        SynapseStreamResult(uid=uid, accumulated_chunks=[completion] if completion else [])
+        for uid, completion in enumerate(COMPLETIONS)
+    ]
+    return DendriteResponseEvent(uids=list(range(len(COMPLETIONS))), timeout=15, stream_results=stream_results)
+
+
+@pytest.mark.parametrize("model, reference", [(RougeRewardModel(), REFERENCE), (FloatDiffModel(), "42")])
+def test_process_pool_rewards_match_in_process(model, reference):
+    assert model.execution == "process"
+    response_event = _response_event()
+    expected = model.reward(reference, response_event)
+
+    output, reward_time = model.compute_reward(reference, response_event)
+    assert np.allclose(output.rewards, expected.rewards)
+    assert output.rewards.shape == output.timings.shape
+    assert reward_time >= 0
+
+
+def test_reset_process_pool_starts_a_new_pool():
+    model = RougeRewardModel()
+    response_event = _response_event()
+    model.compute_reward(REFERENCE, response_event)
+    pool = execution.reward_process_pool()
+
+    execution.reset_process_pool()
+    output, _ = model.compute_reward(REFERENCE, response_event)
+    assert execution.reward_process_pool() is not pool
+    assert np.allclose(output.rewards, model.reward(REFERENCE, response_event).rewards)
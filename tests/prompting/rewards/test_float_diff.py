@@ -0,0 +1,42 @@
+# ruff: noqa: E402
+from prompting import settings
+
+settings.settings = settings.Settings(mode="mock")
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from prompting.rewards.float_diff import FloatDiffModel
+
+test_cases = [
+    ("The answer is 42.", 42.0),
+    ("It costs 1,250 dollars", 1250.0),
+    ("roughly 1.5e3 units", 1500.0),
+    ("the ratio is 3/4", 0.75),
+    ("2 apples and (6+4)", 10.0),
+    ("no numbers here at all", None),
+    ("the result is 9**9**9**9", None),
+    ("the circumference is 2*pi", 2 * math.pi),
+    ("it is pi", math.pi),
+    ("the side is sqrt(16)", 4.0),
+    ("about sqrt(2)/2", math.sqrt(2) / 2),
+    ("it equals 2**10", 1024.0),
+    ("it equals 9**99999", None),
+    ("it equals (9**99)**99", None),
+]
+
+
+@pytest.mark.parametrize("text, expected", test_cases)
+def test_extract_number(text: str, expected: float | None):
+    assert FloatDiffModel.extract_number(text) == expected
+
+
+def test_big_powers_are_rejected_off_the_main_thread():
+    texts = ["the result is 99999**99999999", "the result is ((9**99)**99)**99", "the result is 7**(9**9)"]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        results = list(executor.map(FloatDiffModel.extract_number, texts))
+    assert results == [None, None, None]
+    assert time.perf_counter() - t0 < 1
@@ -0,0 +1,44 @@
+# ruff: noqa: E402
+import numpy as np
+
+from prompting import settings
+
+settings.settings = settings.Settings(mode="mock")
+from prompting.rewards.exact_match import ExactMatchRewardModel
+from prompting.rewards.registry import RewardModelRegistry
+from prompting.rewards.relevance import RelevanceRewardModel
+
+
+class ConstantEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, inputs, to_numpy=True, **kwargs):
+        self.calls += 1
+        return np.ones((len(inputs), 4), dtype=np.float32)
+
+
+def test_get_returns_one_instance_per_class():
+    registry = RewardModelRegistry()
+    assert registry.get(ExactMatchRewardModel) is registry.get(ExactMatchRewardModel)
+    assert isinstance(registry.get(ExactMatchRewardModel), ExactMatchRewardModel)
+
+
+def test_set_embedding_model_wraps_it_in_a_cache():
+    registry = RewardModelRegistry()
+    embedder = ConstantEmbedder()
+    registry.set_embedding_model(embedder, model_name="constant")
+
+    embedding_model = registry.embedding_model()
+    assert embedding_model.model is embedder
+    embedding_model.encode(["a", "b"])
+    embedding_model.encode(["a", "b"])
+    assert embedder.calls == 1
+
+
+def test_relevance_model_is_created_without_loading_the_embedding_model():
+    model = RelevanceRewardModel(weight=0.5)
+    assert model.embedding_model is None
+    embedder = ConstantEmbedder()
+    model.embedding_model = embedder
+    assert model.encoder is embedder
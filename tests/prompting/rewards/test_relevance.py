@@ -0,0 +1,80 @@
+# ruff: noqa: E402
+import zlib
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from prompting import settings
+
+settings.settings = settings.Settings(mode="mock")
+from prompting.base.dendrite import DendriteResponseEvent, SynapseStreamResult
+from prompting.rewards.embedding_cache import CachedEmbeddingModel, EmbeddingCache
+from prompting.rewards.relevance import RelevanceRewardModel
+
+DIM = 16
+REFERENCE = "The quick brown fox jumps over the lazy dog near the river bank."
+COMPLETIONS = [
+    "A quick brown fox jumped over a lazy dog.",
+    "",
+    "Completely unrelated text about the stock market and interest rates, which goes on for a while longer.",
+    "fox",
+    "",
+    "A quick brown fox jumped over a lazy dog.",
+    "The quick brown fox jumps over the lazy dog near the river bank.",
+]
+
+
+class HashingModel:
+    """Bag of words hashed into `DIM` buckets, plus a constant component so that the empty string isn't a zero vector."""
+
+    def encode(self, texts: str | list[str], to_numpy: bool = True, **kwargs) -> np.ndarray:
+        texts = [texts] if isinstance(texts, str) else texts
+        embeddings = np.zeros((len(texts), DIM), dtype=np.float32)
+        embeddings[:, 0] = 1.0
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                embeddings[row, zlib.crc32(word.encode()) % DIM] += 1.0
+        return embeddings
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> float:
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def _unbatched_rewards(reference: str, completions: list[str]) -> list[float]:
+    """The rewards of the per-completion implementation, which embedded every text on its own."""
+    model = HashingModel()
+    reference_embedding = model.encode(reference)[0].astype(np.float64)
+    baseline = _cosine(reference_embedding, model.encode("")[0])
+    rewards = []
+    for completion in completions:
+        if not completion:
+            rewards.append(0.0)
+            continue
+        rewards.append(_cosine(reference_embedding, model.encode(completion)[0] - baseline))
+    return np.clip(rewards, 0, 1).tolist()
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 32])
+def test_batched_rewards_match_unbatched(batch_size):
+    stream_results = [
+        SynapseStreamResult(uid=uid, accumulated_chunks=[completion] if completion else [])
+        for uid, completion in enumerate(COMPLETIONS)
+    ]
+    response_event = DendriteResponseEvent(
+        uids=list(range(len(COMPLETIONS))), timeout=15, stream_results=stream_results
+    )
+    embedding_model = CachedEmbeddingModel(
+        HashingModel(), model_name="hashing", pooling_strategy="cls", cache=EmbeddingCache(max_bytes=1024**2)
+    )
+    model = RelevanceRewardModel(embedding_model=embedding_model)
+
+    batch_settings = settings.settings.model_copy(update={"EMBEDDING_BATCH_SIZE": batch_size})
+    with patch("prompting.rewards.embedding_cache.settings", batch_settings):
+        output = model.reward(REFERENCE, response_event)
+
+    expected = _unbatched_rewards(REFERENCE, COMPLETIONS)
+    assert np.allclose(output.rewards, expected, atol=1e-6)
+    assert output.rewards[1] == output.rewards[4] == 0
+    assert output.rewards[-1] > 0
@@ -0,0 +1,51 @@
+# ruff: noqa: E402
+import threading
+from typing import ClassVar
+
+import numpy as np
+
+from prompting import settings
+
+settings.settings = settings.Settings(mode="mock")
+from prompting.base.dendrite import DendriteResponseEvent, SynapseStreamResult
+from prompting.rewards.reward import BaseRewardConfig, BaseRewardModel, BatchRewardOutput
+from prompting.tasks.base_task import BaseTextTask
+
+# Both reward models have to be running at the same time to get past the barrier.
+_barrier = threading.Barrier(2, timeout=10)
+
+
+class ConstantRewardModel(BaseRewardModel):
+    value: float
+
+    def reward(self, reference: str, response_event, **kwargs) -> BatchRewardOutput:
+        _barrier.wait()
+        rewards = np.full(len(response_event.completions), self.value)
+        return BatchRewardOutput(rewards=rewards, timings=np.zeros_like(rewards))
+
+
+class FirstRewardModel(ConstantRewardModel):
+    pass
+
+
+class SecondRewardModel(ConstantRewardModel):
+    pass
+
+
+class ConcurrentRewardConfig(BaseRewardConfig):
+    reward_definitions: ClassVar[list[BaseRewardModel]] = [
+        FirstRewardModel(weight=0.5, value=1.0),
+        SecondRewardModel(weight=0.5, value=0.25),
+    ]
+
+
+def test_reward_models_run_concurrently_in_order():
+    stream_results = [SynapseStreamResult(uid=uid, accumulated_chunks=["answer"]) for uid in range(3)]
+    response_event = DendriteResponseEvent(uids=[0, 1, 2], timeout=10, stream_results=stream_results)
+
+    reward_events = ConcurrentRewardConfig.apply(response_event=response_event, reference="answer", task=BaseTextTask())
+
+    assert [event.reward_model_name for event in reward_events] == ["FirstRewardModel", "SecondRewardModel"]
+    assert list(reward_events[0].rewards) == [1.0] * 3
+    assert list(reward_events[1].rewards) == [0.25] * 3
+    assert all(0 <= event.queue_time <= event.batch_time for event in reward_events)
@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from prompting.rewards.rouge_engine import RougeScorer
+
+WORDS = ["the", "cat", "sat", "on", "a", "mat", ".", "dog", "ran", "home", "."]
+
+
+def _random_text(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 40)))
+
+
+def test_matches_rouge_package():
+    rouge = pytest.importorskip("rouge")
+    rng = random.Random(0)
+    for _ in range(200):
+        reference, completion = _random_text(rng), _random_text(rng)
+        if not reference.replace(".", "").strip() or not completion.replace(".", "").strip():
+            continue
+        expected = rouge.Rouge().get_scores(reference, completion)[0]
+        scorer = RougeScorer(reference)
+        for ngram in ["rouge-l", "rouge-1", "rouge-2"]:
+            scores = scorer.score(completion, ngram)
+            for metric in "fpr":
+                assert scores[metric] == pytest.approx(expected[ngram][metric], abs=1e-9)
+
+
+def test_rouge_l_scores():
+    scorer = RougeScorer("the cat sat on the mat")
+    assert scorer.score("the cat sat on the mat")["f"] == pytest.approx(1.0, abs=1e-6)
+    assert scorer.score("dog ran home")["f"] == 0.0
+    scores = scorer.score("the cat ran home")
+    assert scores["p"] == pytest.approx(2 / 5)
+    assert scores["r"] == pytest.approx(2 / 4)
+
+
+def test_max_tokens():
+    scorer = RougeScorer("a b c d", max_tokens=2)
+    assert scorer.score("a b")["f"] == pytest.approx(1.0, abs=1e-6)
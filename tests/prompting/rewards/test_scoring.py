@@ -0,0 +1,93 @@
+# ruff: noqa: E402
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from prompting import settings
+
+settings.settings = settings.Settings.load(mode="mock")
+from prompting import mutable_globals
+from prompting.llms.model_zoo import ModelConfig
+from prompting.rewards.scoring import ScoringConfig, TaskScorer
+from prompting.utils.scoring_queue import ScoringQueue
+
+MODEL_A = ModelConfig(llm_model_id="model-a", reward=0.1, min_ram=1)
+MODEL_B = ModelConfig(llm_model_id="model-b", reward=0.1, min_ram=1)
+
+
+class FakeTask:
+    def __init__(self, task_id: str, llm_model: ModelConfig | None, fail_reference: bool = False):
+        self.task_id = task_id
+        self.llm_model = llm_model
+        self.fail_reference = fail_reference
+
+    def make_reference(self, dataset_entry):
+        if self.fail_reference:
+            raise ValueError("No reference")
+
+
+def _config(task: FakeTask) -> ScoringConfig:
+    return ScoringConfig(
+        task=task, response=None, dataset_entry=None, block=1, step=1, task_id=task.task_id, created_at=0.0
+    )
+
+
+def _run_step(tasks: list[FakeTask], score=None) -> tuple[list[str], ScoringQueue, AsyncMock, dict]:
+    """Run one scoring step on a queue of `tasks` with only MODEL_A loaded."""
+    queue = ScoringQueue()
+    for task in tasks:
+        queue.append(_config(task))
+    scored = []
+
+    def record(self, scoring_config: ScoringConfig) -> None:
+        if score is not None:
+            score(scoring_config)
+        scored.append(scoring_config.task_id)
+
+    scorer = TaskScorer()
+    model_scheduler = SimpleNamespace(run_step=AsyncMock())
+    with (
+        patch.object(mutable_globals, "scoring_queue", queue),
+        patch("prompting.rewards.scoring.model_manager", SimpleNamespace(active_models={MODEL_A: None})),
+        patch("prompting.rewards.scoring.model_scheduler", model_scheduler),
+        patch.object(TaskScorer, "score", record),
+    ):
+        asyncio.run(scorer.run_step())
+        metrics = scorer.metrics()
+    return scored, queue, model_scheduler.run_step, metrics
+
+
+def test_step_drains_every_scorable_task():
+    tasks = [FakeTask("a1", MODEL_A), FakeTask("b1", MODEL_B), FakeTask("none", None), FakeTask("a2", MODEL_A)]
+    scored, queue, scheduler_step, metrics = _run_step(tasks)
+
+    assert sorted(scored) == ["a1", "a2", "none"]
+    assert [config.task_id for config in queue] == ["b1"]
+    scheduler_step.assert_not_awaited()
+    assert metrics["scored"] == 3
+    assert metrics["queue_length"] == 1
+    assert metrics["tasks_per_minute"] > 0
+    assert metrics["avg_time_in_queue"] > 0
+
+
+def test_failed_tasks_are_not_counted():
+    def score(scoring_config: ScoringConfig) -> None:
+        if scoring_config.task_id == "error":
+            raise RuntimeError("Reward model failed")
+
+    tasks = [FakeTask("ok", MODEL_A), FakeTask("no-reference", MODEL_A, fail_reference=True), FakeTask("error", None)]
+    scored, queue, _, metrics = _run_step(tasks, score=score)
+
+    assert scored == ["ok"]
+    assert len(queue) == 0
+    assert metrics["scored"] == 1
+
+
+def test_model_is_rotated_when_nothing_is_scorable():
+    scored, queue, scheduler_step, metrics = _run_step([FakeTask("b1", MODEL_B)])
+
+    assert scored == []
+    assert len(queue) == 1
+    scheduler_step.assert_awaited_once()
+    assert metrics["scored"] == 0
+    assert metrics["oldest_queued_age"] > 0
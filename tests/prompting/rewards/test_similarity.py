@@ -0,0 +1,31 @@
+import numpy as np
+
+from prompting.rewards.similarity import cosine_similarity, paired_cosine_similarity
+
+
+def test_matches_pairwise_cosine():
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(5, 16)).astype(np.float32)
+    references = rng.normal(size=(3, 16)).astype(np.float32)
+
+    similarities = cosine_similarity(embeddings, references)
+
+    assert similarities.shape == (5, 3)
+    for i, embedding in enumerate(embeddings.astype(np.float64)):
+        for j, reference in enumerate(references.astype(np.float64)):
+            expected = embedding @ reference / (np.linalg.norm(embedding) * np.linalg.norm(reference))
+            assert np.isclose(similarities[i, j], expected)
+
+
+def test_zero_vectors_and_float16_storage():
+    similarities = cosine_similarity(np.zeros((2, 4)), np.ones(4), dtype=np.float16)
+    assert similarities.tolist() == [[0.0], [0.0]]
+    assert np.isclose(cosine_similarity(np.ones(4), np.ones(4), dtype=np.float16)[0, 0], 1.0, atol=1e-3)
+
+
+def test_paired_matches_diagonal():
+    rng = np.random.default_rng(1)
+    embeddings = rng.normal(size=(4, 8))
+    others = rng.normal(size=(4, 8))
+    expected = np.diag(cosine_similarity(embeddings, others))
+    assert np.allclose(paired_cosine_similarity(embeddings, others), expected)
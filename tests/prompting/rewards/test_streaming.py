@@ -0,0 +1,36 @@
+# ruff: noqa: E402
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from prompting import settings
+
+settings.settings = settings.Settings(mode="mock")
+import numpy as np
+
+from prompting.base.dendrite import DendriteResponseEvent, SynapseStreamResult
+from prompting.rewards.streaming import StreamingRewardModel
+
+# One token per word, so that the test doesn't need to download the tiktoken encoding.
+WORD_ENCODING = SimpleNamespace(encode_ordinary_batch=lambda chunks, num_threads: [chunk.split() for chunk in chunks])
+
+
+def test_tokens_are_counted_when_scored():
+    long_chunk = "one two three four five six"
+    stream_results = [
+        SynapseStreamResult(uid=0, accumulated_chunks=["Hi ", "there"]),
+        SynapseStreamResult(uid=1, accumulated_chunks=[long_chunk, long_chunk]),
+        SynapseStreamResult(uid=2, accumulated_chunks=None),
+        SynapseStreamResult(uid=3, accumulated_chunks=["ignored"], tokens_per_chunk=[10, 10, 10, 10, 10]),
+    ]
+    response_event = DendriteResponseEvent(uids=[0, 1, 2, 3], timeout=15, stream_results=stream_results)
+    assert all(result.tokens_per_chunk is None for result in stream_results[:3])
+
+    with patch("prompting.utils.tokens.get_chunk_encoding", return_value=WORD_ENCODING):
+        output = StreamingRewardModel(max_tokens_per_chunk=4).reward("", response_event)
+
+    assert stream_results[0].tokens_per_chunk.tolist() == [1, 1]
+    assert stream_results[1].tokens_per_chunk.tolist() == [6, 6]
+    assert stream_results[2].tokens_per_chunk.tolist() == []
+    # Counts which were already known are not recomputed.
+    assert stream_results[3].tokens_per_chunk == [10, 10, 10, 10, 10]
+    assert np.allclose(output.rewards, [0, 0.5, 0, 1])
@@ -1,4 +1,5 @@
 # ruff: noqa: E402
+import json
 from unittest.mock import MagicMock
 
 import numpy as np
@@ -7,6 +8,8 @@ import pytest
 from prompting import settings
 
 settings.settings = settings.Settings.load(mode="mock")
+from prompting.datasets.random_website import DDGDatasetEntry
+from prompting.rewards.execution import CompletionsEvent
 from prompting.rewards.web_retrieval import WebRetrievalRewardModel
 
 
@@ -37,31 +40,42 @@ def test_parse_response(completion, expected_url, expected_content, expected_rel
     assert response_relevant == expected_relevant
 
 
-def test_cosine_similarity_identical_embeddings():
-    # Mock identical embeddings.
+def test_reward_on_prefetched_content():
+    vectors = {
+        "test search": [1, 0, 0],
+        "Reference content": [1, 0, 0],
+        "Response content": [1, 0, 0],
+        "Scraped content": [1, 0, 0],
+        "Section": [1, 0, 0],
+        "Unrelated page": [0, 1, 0],
+    }
     mock_embedding_model = MagicMock()
-    mock_embedding_model.encode.return_value = np.array([1, 2, 3])
+    mock_embedding_model.encode.side_effect = lambda texts, to_numpy: np.array([vectors[text] for text in texts])
 
     model = WebRetrievalRewardModel()
     model.embedding_model = mock_embedding_model
 
-    similarity = model._cosine_similarity("content1", "content1")
-    assert similarity == pytest.approx(1.0)
-
-
-def test_cosine_similarity_orthogonal_embeddings():
-    # Mock orthogonal embeddings.
-    def encode_mock(text, to_numpy):
-        return np.array([1, 0]) if text == "content1" else np.array([0, 1])
-
-    mock_embedding_model = MagicMock()
-    mock_embedding_model.encode.side_effect = encode_mock
-
-    model = WebRetrievalRewardModel()
-    model.embedding_model = mock_embedding_model
-
-    similarity = model._cosine_similarity("content1", "content2")
-    assert similarity == pytest.approx(0.0)
+    reference = json.dumps(
+        DDGDatasetEntry(
+            search_term="test search", website_url="http://example.com", website_content="Reference content"
+        ).model_dump_json()
+    )
+    completions = [
+        json.dumps({"url": "http://a.com", "content": "Response content", "relevant": "Section"}),
+        json.dumps({"url": "http://unreachable.com", "content": "Response content"}),
+        "",
+        json.dumps({"url": "http://b.com", "content": "Response content"}),
+    ]
+    scraped_contents = {
+        "http://a.com": "Scraped content",
+        "http://unreachable.com": None,
+        "http://b.com": "Unrelated page",
+    }
+    output = model.reward(reference, CompletionsEvent(completions=completions, uids=[0, 1, 2, 3]), scraped_contents)
+
+    assert output.rewards.tolist() == pytest.approx([1.0, 0.0, 0.0, 0.0])
+    # The search term, the reference and the miners' texts are embedded in a single call.
+    assert mock_embedding_model.encode.call_count == 1
 
 
 # TODO: Implement reward tests.
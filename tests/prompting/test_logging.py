@@ -0,0 +1,55 @@
+# ruff: noqa: E402
+import json
+from array import array
+from dataclasses import asdict
+
+import numpy as np
+
+from prompting import settings
+
+settings.settings = settings.Settings.load(mode="mock")
+from prompting.base.dendrite import DendriteResponseEvent, SynapseStreamResult
+from prompting.utils.logging import ValidatorLoggingEvent, convert_arrays_to_lists, unpack_events
+from prompting.utils.timer import ChunkTimer, StreamTimingStats
+
+
+def test_convert_arrays_to_lists_is_recursive():
+    stats = StreamTimingStats(ttft=0.5, n_chunks=1)
+    data = {
+        "array": np.array([1, 2]),
+        "nested": {"timings": array("d", [0.5]), "stats": [stats]},
+        "scalar": np.float32(0.5),
+    }
+    assert convert_arrays_to_lists(data) == {
+        "array": [1, 2],
+        "nested": {"timings": [0.5], "stats": [asdict(stats)]},
+        "scalar": 0.5,
+    }
+
+
+def test_validator_event_is_json_serialisable():
+    chunk_timer = ChunkTimer()
+    chunk_timer.start()
+    for _ in range(2):
+        chunk_timer.tick()
+    stream_results = [
+        SynapseStreamResult(
+            uid=1,
+            accumulated_chunks=["a", "b"],
+            accumulated_chunks_timings=chunk_timer.timings,
+            tokens_per_chunk=np.array([1, 2], dtype=np.int32),
+            timing_stats=chunk_timer.stats(),
+        ),
+        SynapseStreamResult(uid=2, exception="Connection refused", status_code=500),
+    ]
+    event = ValidatorLoggingEvent(
+        block=1,
+        step=2,
+        step_time=0.1,
+        response_event=DendriteResponseEvent(uids=[1, 2], timeout=15, stream_results=stream_results),
+        task_id="task",
+    )
+    unpacked = convert_arrays_to_lists(unpack_events(event))
+    assert json.loads(json.dumps(unpacked))["completions"] == ["ab", ""]
+    assert unpacked["stream_results"][0]["timing_stats"]["n_chunks"] == 2
+    assert unpacked["status_codes"] == [200, 500]
@@ -0,0 +1,30 @@
+# ruff: noqa: E402
+from types import SimpleNamespace
+
+from prompting import settings
+
+settings.settings = settings.Settings(mode="mock")
+from prompting.llms.model_zoo import ModelConfig
+from prompting.utils.scoring_queue import ScoringQueue
+
+MODEL_A = ModelConfig(llm_model_id="model-a", reward=0.1, min_ram=1)
+MODEL_B = ModelConfig(llm_model_id="model-b", reward=0.1, min_ram=1)
+
+
+def _item(name: str, model: ModelConfig | None) -> SimpleNamespace:
+    return SimpleNamespace(name=name, task=SimpleNamespace(llm_model=model))
+
+
+def test_pop_next_respects_arrival_order_across_models():
+    queue = ScoringQueue()
+    for name, model in [("a1", MODEL_A), ("b1", MODEL_B), ("none", None), ("a2", MODEL_A)]:
+        queue.append(_item(name, model))
+
+    assert queue.backlog() == {MODEL_A: 2, MODEL_B: 1, None: 1}
+    assert queue.pop_next([MODEL_A]).name == "a1"
+    assert queue.pop_next([MODEL_A]).name == "none"
+    assert queue.pop_next([MODEL_A]).name == "a2"
+    assert queue.pop_next([MODEL_A]) is None
+    assert len(queue) == 1
+    assert queue.peek().name == "b1"
+    assert [item.name for item in queue] == ["b1"]
@@ -0,0 +1,69 @@
+# ruff: noqa: E402
+from prompting import settings
+
+settings.settings = settings.Settings(mode="mock")
+import asyncio
+import time
+
+import httpx
+
+from prompting.utils.web_scraper import TTLCache, WebScraper
+
+
+class _TextScraper(WebScraper):
+    @staticmethod
+    def extract(html: str) -> str | None:
+        return html.upper() or None
+
+
+def _scraper(ttl: float = 60) -> WebScraper:
+    return _TextScraper(cache=TTLCache(max_size=16, ttl=ttl), concurrency=4, request_timeout=5)
+
+
+def test_fetch_many_deduplicates_and_caches():
+    requests: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(str(request.url))
+        if request.url.path == "/missing":
+            return httpx.Response(404)
+        return httpx.Response(200, text=f"page {request.url.path}")
+
+    scraper = _scraper()
+    transport = httpx.MockTransport(handler)
+    urls = ["http://a.com/one", "http://a.com/two", "http://a.com/one", "http://a.com/missing"]
+    contents = asyncio.run(scraper.afetch_many(urls, timeout=5, transport=transport))
+    assert contents == {"http://a.com/one": "PAGE /ONE", "http://a.com/two": "PAGE /TWO", "http://a.com/missing": None}
+    assert sorted(requests) == ["http://a.com/missing", "http://a.com/one", "http://a.com/two"]
+
+    # Failed requests aren't cached, the website may be reachable for the next task.
+    assert scraper.cache.lookup("http://a.com/missing") == (False, None)
+    asyncio.run(scraper.afetch_many(urls, timeout=5, transport=transport))
+    assert sorted(requests) == ["http://a.com/missing", "http://a.com/missing", "http://a.com/one", "http://a.com/two"]
+
+
+def test_fetch_many_deadline():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/slow":
+            await asyncio.sleep(10)
+        return httpx.Response(200, text="fast")
+
+    scraper = _scraper()
+    urls = ["http://a.com/slow", "http://a.com/fast"]
+    contents = asyncio.run(scraper.afetch_many(urls, timeout=0.5, transport=httpx.MockTransport(handler)))
+    assert contents == {"http://a.com/slow": None, "http://a.com/fast": "FAST"}
+    # Websites which ran out of time are fetched again next time.
+    assert scraper.cache.lookup("http://a.com/slow") == (False, None)
+
+
+def test_ttl_cache_expiry():
+    cache = TTLCache(max_size=2, ttl=0.01)
+    cache.put("a", "content")
+    time.sleep(0.02)
+    assert cache.lookup("a") == (False, None)
+
+    cache = TTLCache(max_size=2, ttl=60)
+    for key in ("a", "b", "c"):
+        cache.put(key, key)
+    assert cache.lookup("a") == (False, None)
+    assert cache.lookup("c") == (True, "c")